@@ -0,0 +1,402 @@
+import math
+import threading
+import time
+from collections import deque
+import logging
+
+SEVERITY_RANK = {None: 0, 'warning': 1, 'critical': 2}
+
+
+class RollingWindow:
+    """Fixed-size window of recent values with O(1) running mean and standard deviation"""
+
+    __slots__ = ('size', 'values', 'total', 'total_sq', '_pushes')
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    def push(self, value):
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        self._pushes += 1
+        if self._pushes >= self.size * 64:
+            # Re-sum now and then so floating-point drift from the running totals cannot build up
+            self.total = sum(self.values)
+            self.total_sq = sum(v * v for v in self.values)
+            self._pushes = 0
+
+    def mean_std(self):
+        n = len(self.values)
+        mean = self.total / n
+        variance = max(0.0, self.total_sq / n - mean * mean)
+        return mean, math.sqrt(variance)
+
+
+class ThresholdRule:
+    """Fires above (or below) warning/critical levels and only clears past a hysteresis band"""
+
+    kind = 'threshold'
+
+    __slots__ = ('metric', 'label', 'warning', 'critical', 'hysteresis', 'below', 'sustain')
+
+    def __init__(self, metric, label, warning, critical, hysteresis, below=False, sustain=1):
+        self.metric = metric
+        self.label = label
+        self.warning = warning
+        self.critical = critical
+        self.hysteresis = hysteresis
+        self.below = below
+        self.sustain = sustain
+
+    def new_state(self):
+        return [None]
+
+    def evaluate(self, state, value, ts):
+        # Compare on a flipped axis for "below" rules so one code path handles both directions
+        sign = -1 if self.below else 1
+        x, warning, critical, band = sign * value, sign * self.warning, sign * self.critical, self.hysteresis
+        current = state[0]
+        if x >= critical or (current == 'critical' and x > critical - band):
+            level = 'critical'
+        elif x >= warning or (current is not None and x > warning - band):
+            level = 'warning'
+        else:
+            level = None
+        state[0] = level
+        return level
+
+    def describe(self, value):
+        past_critical = value <= self.critical if self.below else value >= self.critical
+        bound = self.critical if past_critical else self.warning
+        return f"{self.label} {value:g} {'below' if self.below else 'above'} {bound:g}"
+
+
+class RateOfChangeRule:
+    """Fires when a metric moves faster than max_rate units per second between readings"""
+
+    kind = 'rate_of_change'
+
+    __slots__ = ('metric', 'label', 'max_rate', 'severity', 'sustain')
+
+    def __init__(self, metric, label, max_rate, severity='warning', sustain=1):
+        self.metric = metric
+        self.label = label
+        self.max_rate = max_rate
+        self.severity = severity
+        self.sustain = sustain
+
+    def new_state(self):
+        # [previous value, previous timestamp, last rate]
+        return [None, None, 0.0]
+
+    def evaluate(self, state, value, ts):
+        previous, previous_ts = state[0], state[1]
+        state[0], state[1] = value, ts
+        if previous is None or ts <= previous_ts:
+            return None
+        state[2] = (value - previous) / (ts - previous_ts)
+        return self.severity if abs(state[2]) > self.max_rate else None
+
+    def describe(self, value):
+        return f"{self.label} changing faster than {self.max_rate:g}/s (now {value:g})"
+
+
+class ZScoreRule:
+    """Fires when a reading lies more than `threshold` standard deviations from its rolling mean"""
+
+    kind = 'zscore'
+
+    __slots__ = ('metric', 'label', 'window', 'threshold', 'min_samples', 'severity', 'sustain')
+
+    def __init__(self, metric, label, window=60, threshold=3.0, min_samples=20, severity='warning', sustain=1):
+        self.metric = metric
+        self.label = label
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.severity = severity
+        self.sustain = sustain
+
+    def new_state(self):
+        return RollingWindow(self.window)
+
+    def evaluate(self, state, value, ts):
+        level = None
+        if len(state.values) >= self.min_samples:
+            # Score against the window before the reading joins it, so a spike cannot mask itself
+            mean, std = state.mean_std()
+            if std > 0 and abs(value - mean) / std > self.threshold:
+                level = self.severity
+        state.push(value)
+        return level
+
+    def describe(self, value):
+        return f"{self.label} {value:g} is more than {self.threshold:g} standard deviations from its recent mean"
+
+
+class Alert:
+    """An active alert; repeat firings update it in place rather than raising duplicates"""
+
+    __slots__ = ('id', 'site', 'rule', 'metric', 'severity', 'value', 'message', 'started_at', 'last_seen', 'count')
+
+    def __init__(self, id, site, rule, severity, value, ts):
+        self.id = id
+        self.site = site
+        self.rule = rule.kind
+        self.metric = rule.metric
+        self.severity = severity
+        self.value = value
+        self.message = rule.describe(value)
+        self.started_at = ts
+        self.last_seen = ts
+        self.count = 1
+
+    def to_dict(self, silenced=False):
+        return {
+            'id': self.id,
+            'site': self.site,
+            'rule': self.rule,
+            'metric': self.metric,
+            'severity': self.severity,
+            'value': self.value,
+            'message': self.message,
+            'started_at': self.started_at,
+            'last_seen': self.last_seen,
+            'count': self.count,
+            'silenced': silenced
+        }
+
+
+class RuleBinding:
+    """A rule's per-site state plus its debounce streak, suppression window and active alert"""
+
+    __slots__ = ('rule', 'state', 'key', 'streak', 'cooldown_until', 'alert')
+
+    def __init__(self, rule, key):
+        self.rule = rule
+        self.state = rule.new_state()
+        self.key = key
+        self.streak = 0
+        self.cooldown_until = 0.0
+        self.alert = None
+
+
+def site_rules(profile):
+    """Build the default rule set for a site from its sensor ranges, OEE and line targets"""
+    rules = []
+    for metric, (warning, critical, hysteresis, max_rate) in profile.alert_thresholds.items():
+        label = metric.capitalize()
+        rules.append(ThresholdRule(metric, label, warning, critical, hysteresis))
+        rules.append(RateOfChangeRule(metric, label, max_rate, sustain=2))
+    for metric, label in (('temperature', 'Temperature'), ('vibration', 'Vibration')):
+        rules.append(ZScoreRule(metric, label, window=60, threshold=3.0, min_samples=20))
+    rules.append(ThresholdRule('oee', 'OEE', profile.oee_target, profile.oee_target - 5, 1.0, below=True, sustain=3))
+    for line in profile.production_lines:
+        rules.append(ThresholdRule(
+            f'efficiency:{line.id}', f'{line.name} efficiency',
+            line.efficiency_target, line.efficiency_target - 5, 1.0, below=True, sustain=3
+        ))
+    return rules
+
+
+def sensor_readings(sensor_data):
+    """Flatten a sensor_data section into metric -> value readings"""
+    return {metric: reading['value'] for metric, reading in sensor_data.items()}
+
+
+def mes_readings(mes_data):
+    """Flatten an mes_data section into OEE and per-line efficiency readings"""
+    readings = {'oee': mes_data['overall_equipment_effectiveness']['oee']}
+    for line in mes_data['production_lines']:
+        if line['status'] == 'running':
+            readings[f"efficiency:{line['id']}"] = line['efficiency']
+    return readings
+
+
+class AlertEngine:
+    """Evaluates readings against per-site rules incrementally, with dedup, cooldown and silencing
+
+    Each reading only touches the rules bound to its (site, metric) and their
+    constant-size state, so evaluation cost does not grow with history.
+    """
+
+    def __init__(self, cooldown=60.0, recent=50, silences=None):
+        self.cooldown = cooldown
+        # Optional shared store so silences apply in every worker process
+        self.silences = silences
+        self._bindings = {}
+        self._active = {}
+        self._silenced = {}
+        self._recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+        self.readings = 0
+        self.raised = 0
+        self.cleared = 0
+        self.suppressed = 0
+
+    def add_site(self, site, rules):
+        """Bind a rule set to a site, replacing any rules it had"""
+        with self._lock:
+            for key in [key for key in self._bindings if key[0] == site]:
+                del self._bindings[key]
+            for rule in rules:
+                key = f'{site}:{rule.kind}:{rule.metric}'
+                self._bindings.setdefault((site, rule.metric), []).append(RuleBinding(rule, key))
+
+    def observe(self, site, readings, ts=None):
+        """Feed a batch of metric -> value readings taken at one timestamp"""
+        ts = ts if ts is not None else time.time()
+        with self._lock:
+            for metric, value in readings.items():
+                bindings = self._bindings.get((site, metric))
+                if bindings is None or value is None:
+                    continue
+                self.readings += 1
+                for binding in bindings:
+                    self._evaluate(site, binding, value, ts)
+
+    def _evaluate(self, site, binding, value, ts):
+        rule = binding.rule
+        level = rule.evaluate(binding.state, value, ts)
+        alert = binding.alert
+
+        if level is None:
+            binding.streak = 0
+            if alert is not None:
+                del self._active[binding.key]
+                binding.alert = None
+                binding.cooldown_until = ts + self.cooldown
+                self._recent.append(alert)
+                self.cleared += 1
+            return
+
+        binding.streak += 1
+        if alert is not None:
+            alert.last_seen = ts
+            alert.value = value
+            alert.count += 1
+            if level != alert.severity:
+                alert.severity = level
+                alert.message = rule.describe(value)
+            return
+
+        if binding.streak < rule.sustain:
+            return
+        if ts < binding.cooldown_until:
+            # Flapping right after a clear; hold off instead of re-raising
+            self.suppressed += 1
+            return
+        binding.alert = self._active[binding.key] = Alert(binding.key, site, rule, level, value, ts)
+        self.raised += 1
+        logging.info(f"Alert raised: {binding.key} {level} ({binding.alert.message})")
+
+    def silence(self, alert_id, seconds, now=None):
+        """Hide an alert id from the active list for a while; the rule keeps evaluating"""
+        now = now if now is not None else time.time()
+        if self.silences is not None:
+            self.silences.silence(alert_id, now + seconds)
+            return
+        with self._lock:
+            self._silenced[alert_id] = now + seconds
+
+    def silenced(self, now=None):
+        """Get alert id -> silenced-until for silences still in effect"""
+        now = now if now is not None else time.time()
+        if self.silences is not None:
+            return self.silences.silences(now)
+        with self._lock:
+            self._silenced = {key: until for key, until in self._silenced.items() if until > now}
+            return dict(self._silenced)
+
+    def active(self, site=None, include_silenced=False, now=None):
+        """List active alerts, most severe and most recent first"""
+        silenced = self.silenced(now)
+        with self._lock:
+            alerts = [
+                alert.to_dict(alert.id in silenced)
+                for alert in self._active.values()
+                if site is None or alert.site == site
+            ]
+        if not include_silenced:
+            alerts = [alert for alert in alerts if not alert['silenced']]
+        alerts.sort(key=lambda alert: (-SEVERITY_RANK[alert['severity']], -alert['started_at']))
+        return alerts
+
+    def recent(self, site=None):
+        """List recently cleared alerts, newest first"""
+        with self._lock:
+            return [alert.to_dict() for alert in reversed(self._recent) if site is None or alert.site == site]
+
+    def stats(self):
+        silenced = len(self.silenced())
+        with self._lock:
+            by_severity = {'warning': 0, 'critical': 0}
+            for alert in self._active.values():
+                by_severity[alert.severity] += 1
+            return {
+                'readings': self.readings,
+                'raised': self.raised,
+                'cleared': self.cleared,
+                'suppressed': self.suppressed,
+                'active': by_severity,
+                'silenced': silenced
+            }
+
+
+class AlertMonitor:
+    """Background thread feeding live sensor and MES readings into the alert engine
+
+    `is_leader` gates evaluation to one worker process, which hands the engine to
+    `publish` after every round so the other workers can serve its alerts.
+    """
+
+    def __init__(self, engine, load_section, sites, interval=2.0, is_leader=None, publish=None):
+        self.engine = engine
+        self.load_section = load_section
+        self.sites = sites
+        self.interval = interval
+        self.is_leader = is_leader
+        self.publish = publish
+        self._seen = {}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='alert-monitor', daemon=True)
+            self._thread.start()
+
+    def poll(self, site, now=None):
+        """Evaluate a site's latest sections, skipping any still-cached copy already evaluated"""
+        now = now if now is not None else time.time()
+        readings = {}
+        for name, flatten in (('sensor_data', sensor_readings), ('mes_data', mes_readings)):
+            section = self.load_section(name, site)
+            if section is not self._seen.get((site, name)):
+                self._seen[(site, name)] = section
+                readings.update(flatten(section))
+        if readings:
+            self.engine.observe(site, readings, now)
+
+    def _run(self):
+        while True:
+            if self.is_leader is None or self.is_leader():
+                for site in self.sites:
+                    try:
+                        self.poll(site)
+                    except Exception as e:
+                        logging.error(f"Error evaluating alerts for {site}: {str(e)}")
+                if self.publish is not None:
+                    try:
+                        self.publish(self.engine)
+                    except Exception as e:
+                        logging.error(f"Error publishing alerts: {str(e)}")
+            time.sleep(self.interval)
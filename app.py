@@ -2,19 +2,25 @@ import os
 import logging
 from flask import Flask
 from flask_cors import CORS
+from responses import FastJSONProvider
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
 # Create the app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-for-dashboard")
 
 # Enable CORS for API endpoints
 CORS(app)
 
+# Request metrics and the opt-in profiler
+from instrumentation import instrument_app
+instrument_app(app)
+
 # Import routes after app creation to avoid circular imports
 from routes import *
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
@@ -0,0 +1,616 @@
+"""Latency and throughput benchmarks for the dashboard API
+
+Runs every /api/* route for every site against the Flask test client or a
+local gunicorn instance, plus microbenchmarks of each DataService generator,
+alert engine throughput, work order paging and fleet ticks, and writes the results as JSON.
+With --compare, results are checked against a stored baseline and the run exits
+non-zero on a regression. --export-rows also streams a synthetic history through
+every export format, and exits non-zero if exporting every row peaks more than
+--max-export-growth-mb higher than exporting a tenth of them:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --target gunicorn --workers 4 --concurrency 16
+    python benchmark.py --save-baseline
+    python benchmark.py --compare
+    python benchmark.py --export-rows 20000000
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Routes exercised per site; streaming is excluded as it never completes
+SITE_ROUTES = (
+    ('sensor-data', '/api/sensor-data?site={site}'),
+    ('mes-data', '/api/mes-data?site={site}'),
+    ('erp-data', '/api/erp-data?site={site}'),
+    ('work-orders', '/api/work-orders?site={site}'),
+    ('work-orders-filtered', '/api/work-orders?site={site}&status=pending,on_hold&sort=priority&limit=25'),
+    ('production-metrics', '/api/production-metrics?site={site}'),
+    ('historical-data-1h', '/api/historical-data?site={site}&range=1h'),
+    ('historical-data-24h', '/api/historical-data?site={site}&range=24h'),
+    ('historical-data-7d', '/api/historical-data?site={site}&range=7d'),
+    ('historical-data-7d-lttb', '/api/historical-data?site={site}&range=7d&max_points=500'),
+    ('dashboard', '/api/dashboard?site={site}'),
+    ('dashboard-changes', '/api/dashboard/changes?site={site}'),
+    ('alerts', '/api/alerts?site={site}')
+)
+GLOBAL_ROUTES = (
+    ('sites', '/api/sites'),
+    ('sites-summary', '/api/sites/summary')
+)
+
+MICROBENCHMARKS = {
+    'get_sensor_data': lambda service, site: service.get_sensor_data(site),
+    'get_mes_data': lambda service, site: service.get_mes_data(site),
+    'get_erp_data': lambda service, site: service.get_erp_data(site),
+    'get_work_orders': lambda service, site: service.get_work_orders(site),
+    'get_production_metrics': lambda service, site: service.get_production_metrics(site),
+    'get_historical_data_24h': lambda service, site: service.get_historical_data('24h', site),
+    'get_historical_data_1y': lambda service, site: service.get_historical_data('1y', site),
+    'get_historical_data_1y_lttb': lambda service, site: service.get_historical_data('1y', site, max_points=500)
+}
+
+# Metrics compared against the baseline (higher is worse for all of them) and the
+# absolute change below which a difference is treated as measurement noise
+COMPARED_METRICS = {
+    'p50_ms': 0.5,
+    'p95_ms': 2.0,
+    'alloc_bytes_per_request': 16384,
+    'p50_us': 10.0
+}
+
+# A p95 from fewer samples rests on a handful of outliers, so it is reported but not gated
+TAIL_METRICS = ('p95_ms',)
+MIN_TAIL_SAMPLES = 200
+
+# Medians get a noise floor widened by their standard error, estimated from the spread
+# up to a tail percentile: median -> (tail metric, z-score of that tail)
+MEDIAN_SPREAD = {
+    'p50_ms': ('p95_ms', 1.645),
+    'p50_us': ('p99_us', 2.326)
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, payload_bytes):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'requests_per_sec': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'response_bytes': payload_bytes
+    }
+
+
+def sample_count(result):
+    return result.get('requests', result.get('iterations', 0))
+
+
+def median_error(result, metric):
+    """Approximate standard error of a median: 1.25 sigma / sqrt(n), with sigma from the tail spread"""
+    tail, z = MEDIAN_SPREAD[metric]
+    samples = sample_count(result)
+    if tail not in result or not samples:
+        return 0.0
+    sigma = max(result[tail] - result[metric], 0.0) / z
+    return 1.2533 * sigma / math.sqrt(samples)
+
+
+def endpoints(sites):
+    for name, path in SITE_ROUTES:
+        for site in sites:
+            yield f'{name}[{site}]', path.format(site=site)
+    yield from GLOBAL_ROUTES
+
+
+def bench_client(requests, warmup, state_dir):
+    """Benchmark every route in-process through the Flask test client
+
+    History and shared state live in state_dir, and only the source refresher
+    runs; the history recorder and alert monitor stay off so that they neither
+    write to the working tree nor compete with the timed requests.
+    """
+    environment = bench_environment(state_dir)
+    if not os.environ.get('SHARED_STATE_PATH'):
+        # A single process shares nothing unless asked to, as under app.py
+        del environment['SHARED_STATE_PATH']
+    os.environ.update(environment, DEFER_BACKGROUND_START='1')
+    from app import app
+    import routes
+
+    routes.source_hub.start()
+    client = app.test_client()
+    results = {}
+    for name, path in endpoints(list(routes.data_service.sites)):
+        for _ in range(warmup):
+            client.get(path)
+
+        latencies = []
+        payload_bytes = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            response = client.get(path)
+            payload_bytes = len(response.get_data())
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f'{path} returned HTTP {response.status_code}')
+        result = summarize(latencies, time.perf_counter() - started, payload_bytes)
+
+        # Allocation is measured in a separate pass so tracing does not skew latency
+        tracemalloc.start()
+        peaks = []
+        for _ in range(min(requests, 50)):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            client.get(path)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        result['alloc_bytes_per_request'] = int(statistics.median(peaks))
+        results[name] = result
+    return results
+
+
+def bench_environment(state_dir):
+    """State paths for a benchmarked app, kept out of the working tree"""
+    return {
+        'HISTORY_DB_PATH': os.path.join(state_dir, 'history.db'),
+        'SHARED_STATE_PATH': os.path.join(state_dir, 'shared.db')
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not start listening on port {port}')
+
+
+def bench_gunicorn(requests, warmup, workers, concurrency, state_dir):
+    """Benchmark every route over HTTP against a local gunicorn instance"""
+    from site_registry import SiteRegistry
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'main:app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, **bench_environment(state_dir))
+    )
+    try:
+        wait_for_port(port)
+
+        def timed_get(path):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            try:
+                t0 = time.perf_counter()
+                connection.request('GET', path)
+                response = connection.getresponse()
+                body = response.read()
+                elapsed = time.perf_counter() - t0
+            finally:
+                connection.close()
+            if response.status != 200:
+                raise RuntimeError(f'{path} returned HTTP {response.status}')
+            return elapsed, len(body)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for name, path in endpoints(list(SiteRegistry.load().profiles)):
+                list(pool.map(timed_get, [path] * warmup))
+                started = time.perf_counter()
+                samples = list(pool.map(timed_get, [path] * requests))
+                elapsed = time.perf_counter() - started
+                results[name] = summarize([s[0] for s in samples], elapsed, samples[-1][1])
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def bench_generators(iterations):
+    """Time each DataService generator directly, bypassing HTTP and caching"""
+    from data_service import DataService
+    from timeseries_store import TimeSeriesStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = DataService(TimeSeriesStore(os.path.join(tmp, 'history.db')))
+        results = {}
+        for name, generate in MICROBENCHMARKS.items():
+            for site in service.sites:
+                timings = []
+                for _ in range(iterations):
+                    t0 = time.perf_counter()
+                    generate(service, site)
+                    timings.append(time.perf_counter() - t0)
+                timings.sort()
+                results[f'{name}[{site}]'] = {
+                    'iterations': iterations,
+                    'mean_us': round(statistics.fmean(timings) * 1e6, 2),
+                    'p50_us': round(percentile(timings, 0.50) * 1e6, 2),
+                    'p99_us': round(percentile(timings, 0.99) * 1e6, 2)
+                }
+        return results
+
+
+def bench_alert_engine(iterations):
+    """Measure alert engine throughput on one core with randomized sensor and MES readings"""
+    import random
+    from alert_engine import AlertEngine, site_rules
+    from site_registry import SiteRegistry
+
+    registry = SiteRegistry.load()
+    results = {}
+    for site, profile in registry.profiles.items():
+        engine = AlertEngine()
+        engine.add_site(site, site_rules(profile))
+        batches = []
+        for _ in range(iterations):
+            readings = {metric: random.uniform(low, high) for metric, (low, high) in (
+                ('temperature', profile.temp_range), ('pressure', profile.pressure_range),
+                ('humidity', profile.humidity_range), ('vibration', profile.vibration_range),
+                ('oee', profile.oee_range)
+            )}
+            for line in profile.production_lines:
+                readings[f'efficiency:{line.id}'] = random.uniform(*line.efficiency_range)
+            batches.append(readings)
+
+        timings = []
+        started = time.perf_counter()
+        for i, readings in enumerate(batches):
+            t0 = time.perf_counter()
+            engine.observe(site, readings, i * 2.0)
+            timings.append((time.perf_counter() - t0) / len(readings))
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        results[f'alert_engine_observe[{site}]'] = {
+            'iterations': iterations,
+            'readings_per_sec': round(engine.readings / elapsed),
+            'mean_us': round(statistics.fmean(timings) * 1e6, 2),
+            'p50_us': round(percentile(timings, 0.50) * 1e6, 2),
+            'p99_us': round(percentile(timings, 0.99) * 1e6, 2)
+        }
+    return results
+
+
+def bench_work_order_store(iterations, sizes=(1000, 10000, 100000)):
+    """Measure work order page queries against growing stores; latency should stay flat"""
+    import random
+    from work_order_store import WorkOrderStore
+
+    rng = random.Random(0)
+    results = {}
+    for size in sizes:
+        store = WorkOrderStore()
+        store.sync([{
+            'id': f'WO{i:07d}',
+            'status': rng.choice(('in_progress', 'pending', 'completed', 'on_hold')),
+            'priority': rng.choice(('high', 'medium', 'low')),
+            'assigned_line': f'Line {rng.randint(1, 3)}',
+            'progress': rng.randint(0, 100),
+            'quantity': rng.randint(50, 500),
+            'start_date': f'2024-01-{rng.randint(1, 28):02d}',
+            'due_date': f'2024-02-{rng.randint(1, 28):02d}'
+        } for i in range(size)])
+        for name, query in (
+            ('first_page', {}),
+            ('filtered_page', {'statuses': ('pending',), 'priorities': ('high',), 'sort': 'progress', 'descending': True}),
+            ('line_page', {'statuses': ('pending', 'on_hold'), 'line': 'Line 2', 'sort': 'quantity'})
+        ):
+            timings = []
+            cursor = None
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                page = store.query(limit=25, cursor=cursor, **query)
+                timings.append(time.perf_counter() - t0)
+                # Walk forward through the pages, starting over at the end
+                cursor = page['next_cursor']
+            timings.sort()
+            results[f'work_order_store_{name}[{size}]'] = {
+                'iterations': iterations,
+                'mean_us': round(statistics.fmean(timings) * 1e6, 2),
+                'p50_us': round(percentile(timings, 0.50) * 1e6, 2),
+                'p99_us': round(percentile(timings, 0.99) * 1e6, 2)
+            }
+    return results
+
+
+def bench_fleet_generator(ticks, fleet=None):
+    """Time whole-fleet ticks and one site's JSON conversion (skipped without NumPy)"""
+    try:
+        from fleet_generator import FleetGenerator
+    except ImportError:
+        return {}
+    from site_registry import FleetConfig, SiteRegistry
+
+    fleet = fleet or FleetConfig()
+    generator = FleetGenerator(SiteRegistry.load(fleet=fleet).fleet_profiles(), fleet.seed)
+    tick = generator.tick()
+    site = generator.profiles[0].key
+    size = f'{fleet.sites}x{fleet.lines_per_site}x{fleet.sensors_per_site}'
+    results = {}
+    for name, run in (
+        ('fleet_tick', generator.tick),
+        ('fleet_site_sections', lambda: (generator.site_sensor_data(tick, site), generator.site_mes_data(tick, site),
+                                         generator.site_work_orders(tick, site)))
+    ):
+        timings = []
+        for _ in range(ticks):
+            t0 = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - t0)
+        timings.sort()
+        results[f'{name}[{size}]'] = {
+            'iterations': ticks,
+            'mean_us': round(statistics.fmean(timings) * 1e6, 2),
+            'p50_us': round(percentile(timings, 0.50) * 1e6, 2),
+            'p99_us': round(percentile(timings, 0.99) * 1e6, 2)
+        }
+    return results
+
+
+def peak_rss_kib():
+    """Peak resident memory of this process in KiB
+
+    Reads VmHWM where /proc is available, since it starts over when a process
+    execs; ru_maxrss carries over the peak of the parent it was forked from.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def export_run(path, export_format, count, batch_size, connection):
+    """Export `count` rows of the synthetic history and send back throughput and peak memory growth
+
+    Runs in a freshly spawned process, so the peak before the export covers only
+    the interpreter and its imports.
+    """
+    from export import export_chunks
+    from timeseries_store import TimeSeriesStore
+
+    store = TimeSeriesStore(path)
+    metrics = ('temperature', 'pressure', 'humidity', 'vibration', 'production_rate', 'oee')
+    peak_before = peak_rss_kib()
+    total_bytes = 0
+    started = time.perf_counter()
+    # Six metrics share each timestamp, so ts < count / 6 selects `count` rows
+    batches = store.iter_rows('bench', metrics, 0, count // len(metrics) - 1, 'raw', batch_size)
+    for chunk in export_chunks(export_format, batches):
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - started
+    connection.send({
+        'format': export_format,
+        'rows': count,
+        'seconds': round(elapsed, 2),
+        'rows_per_sec': round(count / elapsed),
+        'mb': round(total_bytes / 1e6, 1),
+        'peak_rss_growth_mb': round((peak_rss_kib() - peak_before) / 1024, 1)
+    })
+    connection.close()
+
+
+def bench_export(rows):
+    """Stream a synthetic history of `rows` raw samples through every export format
+
+    Each format exports a tenth of the rows (at least eight batches, by which
+    point encoder buffers have reached their working size), then all of them,
+    each in its own spawned process. Reports throughput and how far peak memory
+    grew during each export; a streaming export peaks at the same size whatever
+    the row count.
+    """
+    import multiprocessing
+    import sqlite3
+    from export import EXPORT_FORMATS, pa
+    from timeseries_store import TimeSeriesStore
+
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.db')
+        TimeSeriesStore(path)
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute(
+                'INSERT INTO samples_raw (site, metric, ts, value) '
+                'WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < ? - 1) '
+                "SELECT 'bench', CASE i % 6 WHEN 0 THEN 'temperature' WHEN 1 THEN 'pressure' WHEN 2 THEN 'humidity' "
+                "WHEN 3 THEN 'vibration' WHEN 4 THEN 'production_rate' ELSE 'oee' END, "
+                'i / 6, abs(random() % 100000) / 100.0 FROM seq',
+                (rows,)
+            )
+        connection.close()
+
+        for export_format, (_, _, batch_size) in EXPORT_FORMATS.items():
+            if export_format == 'parquet' and pa is None:
+                continue
+            for count in sorted({min(max(rows // 10, 8 * batch_size), rows), rows}):
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=export_run, args=(path, export_format, count, batch_size, sender))
+                process.start()
+                sender.close()
+                try:
+                    results[f'export_{export_format}[{count}]'] = receiver.recv()
+                except EOFError:
+                    raise RuntimeError(f'{export_format} export of {count} rows failed in its benchmark process')
+                finally:
+                    process.join()
+    return results
+
+
+def check_exports(exports, rows, max_growth_mb):
+    """List formats whose peak memory exporting every row exceeded that of their smaller export by more than the bound"""
+    smaller = {
+        result['format']: result for result in exports.values() if result['rows'] != rows
+    }
+    failures = []
+    for name, result in exports.items():
+        reference = smaller.get(result['format'])
+        if result['rows'] != rows or reference is None:
+            continue
+        growth = round(result['peak_rss_growth_mb'] - reference['peak_rss_growth_mb'], 1)
+        if growth > max_growth_mb:
+            failures.append(
+                f"{name} peaked {growth} MB above the {reference['rows']}-row export (limit {max_growth_mb} MB)"
+            )
+    return failures
+
+
+def compare(current, baseline, tolerance):
+    """List metrics that got worse than the baseline by more than the tolerance and the run's noise
+
+    Returns (regressions, ungated), where ungated names tail percentiles skipped
+    for having fewer than MIN_TAIL_SAMPLES samples in either run.
+    """
+    regressions = []
+    ungated = []
+    for section in ('endpoints', 'microbenchmarks'):
+        for name, metrics in current.get(section, {}).items():
+            reference = baseline.get(section, {}).get(name)
+            if reference is None:
+                continue
+            for metric, noise_floor in COMPARED_METRICS.items():
+                if metric not in metrics or metric not in reference or not reference[metric]:
+                    continue
+                if metric in TAIL_METRICS and min(sample_count(metrics), sample_count(reference)) < MIN_TAIL_SAMPLES:
+                    ungated.append(f'{section}/{name} {metric}')
+                    continue
+                if metric in MEDIAN_SPREAD:
+                    # Three standard errors of the difference between the two medians
+                    noise = 3 * math.hypot(median_error(metrics, metric), median_error(reference, metric))
+                    noise_floor = max(noise_floor, noise)
+                ratio = metrics[metric] / reference[metric]
+                if ratio > 1 + tolerance and metrics[metric] - reference[metric] > noise_floor:
+                    regressions.append(
+                        f'{section}/{name} {metric}: {reference[metric]} -> {metrics[metric]} '
+                        f'(+{(ratio - 1) * 100:.0f}%)'
+                    )
+    return regressions, ungated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard API')
+    parser.add_argument('--target', choices=('client', 'gunicorn'), default='client')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent HTTP clients (gunicorn target)')
+    parser.add_argument('--iterations', type=int, default=2000, help='Microbenchmark iterations per generator')
+    parser.add_argument('--export-rows', type=int, default=0,
+                        help='Also stream this many synthetic history rows through each export format')
+    parser.add_argument('--max-export-growth-mb', type=float, default=32.0,
+                        help='Fail if exporting every row peaks this much higher than exporting a tenth')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='Fail if results regress against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed slowdown fraction before failing')
+    args = parser.parse_args()
+    # Checked up front, so a missing baseline does not cost a full benchmark run
+    if args.compare and not args.save_baseline and not os.path.exists(args.baseline):
+        print(f'No baseline recorded at {args.baseline}; run with --save-baseline first', file=sys.stderr)
+        sys.exit(2)
+
+    with tempfile.TemporaryDirectory(prefix='factory-bench-') as state_dir:
+        if args.target == 'client':
+            endpoint_results = bench_client(args.requests, args.warmup, state_dir)
+        else:
+            endpoint_results = bench_gunicorn(args.requests, args.warmup, args.workers, args.concurrency, state_dir)
+
+    results = {
+        'meta': {
+            'target': args.target,
+            'requests_per_endpoint': args.requests,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'endpoints': endpoint_results,
+        'microbenchmarks': {**bench_generators(args.iterations), **bench_alert_engine(args.iterations),
+                            **bench_work_order_store(args.iterations),
+                            **bench_fleet_generator(max(args.iterations // 100, 5))}
+    }
+    if args.export_rows:
+        results['exports'] = bench_export(args.export_rows)
+
+    encoded = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(encoded + '\n')
+    else:
+        print(encoded)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            f.write(encoded + '\n')
+        print(f'Baseline saved to {args.baseline}', file=sys.stderr)
+
+    failed = False
+    if args.export_rows:
+        export_failures = check_exports(results['exports'], args.export_rows, args.max_export_growth_mb)
+        if export_failures:
+            print('Export memory grew with the row count:', file=sys.stderr)
+            for failure in export_failures:
+                print(f'  {failure}', file=sys.stderr)
+            failed = True
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['meta']['target'] != args.target:
+            print(f"Baseline was recorded against {baseline['meta']['target']}, not {args.target}", file=sys.stderr)
+            sys.exit(2)
+        regressions, ungated = compare(results, baseline, args.tolerance)
+        if ungated:
+            print(f'{len(ungated)} p95 values not gated (fewer than {MIN_TAIL_SAMPLES} samples per run)', file=sys.stderr)
+        if regressions:
+            print('Performance regressions:', file=sys.stderr)
+            for regression in regressions:
+                print(f'  {regression}', file=sys.stderr)
+            failed = True
+        else:
+            print('No regressions against baseline', file=sys.stderr)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
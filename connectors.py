@@ -0,0 +1,360 @@
+import http.client
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import quote, urlsplit
+import logging
+
+
+# Paths of the dashboard's own per-section routes; remote gateways are expected to mirror them
+SECTION_PATHS = {
+    'sensor_data': '/api/sensor-data?site={site}',
+    'mes_data': '/api/mes-data?site={site}',
+    'erp_data': '/api/erp-data?site={site}',
+    # Paged; HTTPConnector follows next_cursor through the largest pages in id order, which
+    # stays stable while orders change between requests, so every order is collected once
+    'work_orders': '/api/work-orders?site={site}&sort=id&limit=500',
+    'production_metrics': '/api/production-metrics?site={site}'
+}
+
+
+class SourceError(Exception):
+    """Raised when a data source cannot provide a section"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing source until a cool-down has passed, then allows a single trial"""
+
+    __slots__ = ('failure_threshold', 'reset_timeout', 'failures', 'opened_at', '_lock')
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Check whether a call may go through, moving an expired open breaker to half-open"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let one trial through; a failure re-opens for another full cool-down
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class Connector:
+    """Base class for a data source that can provide one or more dashboard sections"""
+
+    name = 'connector'
+    timeout = 2.0
+
+    def fetch(self, domain, site):
+        """Fetch one section for a site, raising SourceError on failure"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release pooled connections"""
+
+
+class MockConnector(Connector):
+    """Serves sections from the DataService mock generators"""
+
+    name = 'mock'
+
+    def __init__(self, data_service, timeout=2.0):
+        self.data_service = data_service
+        self.timeout = timeout
+
+    def fetch(self, domain, site):
+        return self.data_service.build_section(domain, site)
+
+
+class HTTPConnectionPool:
+    """Small pool of keep-alive HTTP connections to a single host"""
+
+    def __init__(self, base_url, size=4, timeout=2.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def get_json(self, path):
+        """GET a path and decode its JSON body, reusing an idle connection when possible"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise SourceError(f"No free connection to {self.host} within {self.timeout}s")
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._new_connection()
+            try:
+                connection.request('GET', self.base_path + path, headers={'Accept': 'application/json'})
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise SourceError(f"Request to {self.host}{path} failed: {e}") from e
+            self._idle.put(connection)
+            if response.status != 200:
+                raise SourceError(f"{self.host}{path} returned HTTP {response.status}")
+            return json.loads(body)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HTTPConnector(Connector):
+    """Pulls sections from a JSON HTTP API such as an ERP system or historian gateway"""
+
+    def __init__(self, name, base_url, paths, pool_size=4, timeout=2.0):
+        self.name = name
+        self.paths = paths
+        self.timeout = timeout
+        self.pool = HTTPConnectionPool(base_url, pool_size, timeout)
+
+    def fetch(self, domain, site):
+        path = self.paths[domain].format(site=site)
+        data = self._get(path)
+        # A paged list ({'orders', 'next_cursor'}, as /api/work-orders answers) is followed to its last page
+        if isinstance(data, dict) and 'orders' in data and 'next_cursor' in data:
+            orders = list(data['orders'])
+            separator = '&' if '?' in path else '?'
+            while data['next_cursor']:
+                data = self._get(f"{path}{separator}cursor={quote(data['next_cursor'])}")
+                orders.extend(data['orders'])
+            return orders
+        return data
+
+    def _get(self, path):
+        result = self.pool.get_json(path)
+        # Accept both bare payloads and this dashboard's own {'success', 'data'} envelope
+        if isinstance(result, dict) and 'success' in result:
+            if not result['success']:
+                raise SourceError(result.get('error', f'{self.name} reported a failure'))
+            return result['data']
+        return result
+
+    def close(self):
+        self.pool.close()
+
+
+class SQLConnector(Connector):
+    """Pulls sections from a SQL database (e.g. the MES) through a pooled SQLAlchemy engine
+
+    `queries` maps a domain to `(sql, transform)`; the SQL receives a `:site`
+    parameter and `transform(rows, site)` shapes the row mappings into the
+    section payload.
+    """
+
+    def __init__(self, name, url, queries, pool_size=5, timeout=2.0):
+        from sqlalchemy import create_engine, text
+
+        connect_args = {}
+        if url.startswith('postgresql'):
+            connect_args = {
+                'connect_timeout': max(1, int(timeout)),
+                'options': f'-c statement_timeout={int(timeout * 1000)}'
+            }
+        self.name = name
+        self.timeout = timeout
+        self.queries = {domain: (text(sql), transform) for domain, (sql, transform) in queries.items()}
+        self.engine = create_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_timeout=timeout,
+            pool_pre_ping=True,
+            connect_args=connect_args
+        )
+
+    def fetch(self, domain, site):
+        from sqlalchemy.exc import SQLAlchemyError
+
+        statement, transform = self.queries[domain]
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(statement, {'site': site}).mappings().all()
+        except SQLAlchemyError as e:
+            raise SourceError(f"{self.name} query for {domain} failed: {e}") from e
+        return transform(rows, site)
+
+    def close(self):
+        self.engine.dispose()
+
+
+class SourceEntry:
+    """Last good payload for a (domain, site) and its refresh bookkeeping"""
+
+    __slots__ = ('payload', 'fetched_at', 'last_error', 'last_requested', 'inflight')
+
+    def __init__(self):
+        self.payload = None
+        self.fetched_at = None
+        self.last_error = None
+        self.last_requested = time.monotonic()
+        self.inflight = None
+
+
+class SourceHub:
+    """Keeps every requested section fresh from its connector in the background
+
+    Requests read the last good snapshot and never wait on a backend unless
+    nothing has been fetched yet. Refreshes run in parallel on a worker pool,
+    each connector sits behind a circuit breaker, and a failed refresh keeps
+    serving the previous snapshot.
+
+    With `background=False` nothing is refreshed ahead of time; a section is
+    fetched when it is requested after its refresh interval, which suits callers
+    that already decide who fetches when (the cross-worker snapshot cache).
+    """
+
+    def __init__(self, connectors, refresh_intervals, max_workers=8, idle_expiry=300.0, tick=0.5, background=True):
+        self.connectors = connectors
+        self.refresh_intervals = refresh_intervals
+        self.idle_expiry = idle_expiry
+        self.tick = tick
+        self.background = background
+        self.breakers = {connector.name: CircuitBreaker() for connector in set(connectors.values())}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='source-refresh')
+        self._thread = None
+
+    def start(self):
+        """Start the background refresh scheduler (in each worker process, after any fork)"""
+        if self.background and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='source-scheduler', daemon=True)
+            self._thread.start()
+
+    def get(self, domain, site):
+        """Get the last good payload for a section, fetching it once on a cold start"""
+        key = (domain, site)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = SourceEntry()
+            entry.last_requested = time.monotonic()
+            if entry.payload is not None and (self.background or not self._due(key, entry, entry.last_requested)):
+                return entry.payload
+            future = self._submit(key, entry)
+
+        try:
+            future.result(timeout=self.connectors[domain].timeout)
+        except FutureTimeoutError:
+            pass
+        if entry.payload is None:
+            raise SourceError(entry.last_error or f"No data available for {domain} at {site}")
+        return entry.payload
+
+    def _due(self, key, entry, now):
+        return entry.fetched_at is None or now - entry.fetched_at >= self.refresh_intervals.get(key[0], 10.0)
+
+    def status(self):
+        """Get breaker state per source and staleness per section"""
+        now = time.monotonic()
+        with self._lock:
+            sections = {
+                f'{domain}:{site}': {
+                    'source': self.connectors[domain].name,
+                    'age_seconds': round(now - entry.fetched_at, 1) if entry.fetched_at is not None else None,
+                    'stale': entry.fetched_at is None
+                    or now - entry.fetched_at > 2 * self.refresh_intervals.get(domain, 10.0),
+                    'last_error': entry.last_error
+                }
+                for (domain, site), entry in self._entries.items()
+            }
+        return {
+            'sources': {
+                name: {'circuit': breaker.state, 'consecutive_failures': breaker.failures}
+                for name, breaker in self.breakers.items()
+            },
+            'sections': sections
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for connector in set(self.connectors.values()):
+            connector.close()
+
+    def _submit(self, key, entry):
+        # Caller holds self._lock
+        if entry.inflight is None:
+            entry.inflight = self._executor.submit(self._refresh, key, entry)
+        return entry.inflight
+
+    def _refresh(self, key, entry):
+        domain, site = key
+        connector = self.connectors[domain]
+        breaker = self.breakers[connector.name]
+        try:
+            if not breaker.allow():
+                entry.last_error = f"{connector.name} circuit open"
+                return
+            try:
+                payload = connector.fetch(domain, site)
+            except Exception as e:
+                breaker.record_failure()
+                entry.last_error = str(e)
+                logging.warning(f"Refresh of {domain} for {site} from {connector.name} failed, serving stale: {e}")
+                return
+            breaker.record_success()
+            entry.payload = payload
+            entry.fetched_at = time.monotonic()
+            entry.last_error = None
+        finally:
+            with self._lock:
+                entry.inflight = None
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                for key in list(self._entries):
+                    entry = self._entries[key]
+                    if now - entry.last_requested > self.idle_expiry:
+                        # Stop refreshing sections nobody has asked for in a while
+                        if entry.inflight is None:
+                            del self._entries[key]
+                        continue
+                    if self._due(key, entry, now):
+                        self._submit(key, entry)
+            time.sleep(self.tick)
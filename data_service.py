@@ -1,210 +1,180 @@
+import itertools
 import random
 import time
 from datetime import datetime, timedelta
 import logging
+from site_registry import SiteRegistry
+from metrics import timed
+from downsample import lttb_indices
 
 class DataService:
     """Service class to provide mock data for the factory dashboard"""
     
-    def __init__(self):
+    # Sections available through the aggregated dashboard snapshot
+    SNAPSHOT_SECTIONS = ('sensor_data', 'mes_data', 'erp_data', 'work_orders', 'production_metrics', 'historical_data')
+    
+    # Metrics sampled into the time-series store and those plotted on the history chart
+    RECORDED_METRICS = ('temperature', 'pressure', 'humidity', 'vibration', 'production_rate', 'oee')
+    HISTORY_METRICS = ('temperature', 'pressure', 'production_rate')
+    
+    # time_range -> (window in seconds, rollup tier, label format)
+    HISTORY_RANGES = {
+        '1h': (3600, '1m', '%H:%M'),
+        '24h': (86400, '1h', '%H:00'),
+        '7d': (7 * 86400, '1h', '%m/%d %H:00'),
+        '30d': (30 * 86400, '1d', '%m/%d'),
+        '1y': (365 * 86400, '1d', '%Y-%m-%d')
+    }
+    
+    # Most rows per metric read from the store for a downsampled or windowed history query,
+    # and the point budget used for windows requested without one
+    HISTORY_SCAN_LIMIT = 20000
+    DEFAULT_MAX_POINTS = 1000
+    
+    def __init__(self, history_store=None, registry=None):
         self.start_time = datetime.now()
-        self.sites = {
-            'germany': {
-                'name': 'Germany Manufacturing',
-                'timezone': 'Europe/Berlin',
-                'currency': 'EUR',
-                'location_prefix': 'DE-'
-            },
-            'uk': {
-                'name': 'UK Manufacturing',
-                'timezone': 'Europe/London', 
-                'currency': 'GBP',
-                'location_prefix': 'UK-'
-            }
-        }
+        self.history_store = history_store
+        self.registry = registry or SiteRegistry.load()
+        self.sites = self.registry.summaries
+        
+        if history_store is not None:
+            for site in self.sites:
+                if not history_store.has_data(site):
+                    self.seed_history(site)
+        
         logging.info("DataService initialized")
     
     def get_current_timestamp(self):
         """Get current timestamp in ISO format"""
         return datetime.now().isoformat()
     
+    @timed('get_sensor_data')
     def get_sensor_data(self, site='germany'):
         """Generate mock sensor data for specific site"""
-        site_info = self.sites.get(site, self.sites['germany'])
-        location_prefix = site_info['location_prefix']
+        profile = self.registry.get(site)
+        locations = profile.sensor_locations
         
-        # Site-specific variations
-        temp_range = (15.0, 30.0) if site == 'uk' else (20.0, 35.0)
-        pressure_range = (8.0, 45.0) if site == 'uk' else (12.0, 50.0)
+        temperature = round(random.uniform(*profile.temp_range), 1)
+        pressure = round(random.uniform(*profile.pressure_range), 2)
+        humidity = round(random.uniform(*profile.humidity_range), 1)
+        vibration = round(random.uniform(*profile.vibration_range), 2)
         
         return {
             'temperature': {
-                'value': round(random.uniform(*temp_range), 1),
+                'value': temperature,
                 'unit': '°C',
-                'status': random.choice(['normal', 'warning', 'critical']),
-                'location': f'{location_prefix}Production Floor A'
+                'status': profile.sensor_status('temperature', temperature),
+                'location': locations['temperature']
             },
             'pressure': {
-                'value': round(random.uniform(*pressure_range), 2),
+                'value': pressure,
                 'unit': 'bar',
-                'status': random.choice(['normal', 'warning']),
-                'location': f'{location_prefix}Hydraulic System'
+                'status': profile.sensor_status('pressure', pressure),
+                'location': locations['pressure']
             },
             'humidity': {
-                'value': round(random.uniform(25.0 if site == 'uk' else 35.0, 75.0 if site == 'uk' else 65.0), 1),
+                'value': humidity,
                 'unit': '%',
-                'status': 'normal',
-                'location': f'{location_prefix}Climate Control'
+                'status': profile.sensor_status('humidity', humidity),
+                'location': locations['humidity']
             },
             'vibration': {
-                'value': round(random.uniform(0.1, 2.8 if site == 'germany' else 2.2), 2),
+                'value': vibration,
                 'unit': 'mm/s',
-                'status': random.choice(['normal', 'warning']),
-                'location': f'{location_prefix}Motor Assembly'
+                'status': profile.sensor_status('vibration', vibration),
+                'location': locations['vibration']
             }
         }
     
+    @timed('get_mes_data')
     def get_mes_data(self, site='germany'):
         """Generate mock MES (Manufacturing Execution System) data for specific site"""
-        site_info = self.sites.get(site, self.sites['germany'])
-        location_prefix = site_info['location_prefix']
-        
-        # Site-specific performance variations
-        oee_base = 85.0 if site == 'germany' else 82.0
-        quality_base = 97.0 if site == 'germany' else 95.5
+        profile = self.registry.get(site)
         
         return {
             'overall_equipment_effectiveness': {
-                'oee': round(random.uniform(oee_base - 10, oee_base + 10), 1),
+                'oee': round(random.uniform(*profile.oee_range), 1),
                 'availability': round(random.uniform(85.0, 98.0), 1),
                 'performance': round(random.uniform(80.0, 95.0), 1),
-                'quality': round(random.uniform(quality_base - 5, quality_base + 2.5), 1)
+                'quality': round(random.uniform(*profile.quality_range), 1)
             },
             'production_lines': [
                 {
-                    'id': f'{location_prefix}LINE_001',
-                    'name': f'{location_prefix}Assembly Line 1',
-                    'status': random.choice(['running', 'idle', 'maintenance']),
-                    'efficiency': round(random.uniform(80.0, 98.0), 1),
-                    'output_rate': random.randint(45 if site == 'germany' else 40, 65 if site == 'germany' else 60),
-                    'target_rate': 60 if site == 'germany' else 55
-                },
-                {
-                    'id': f'{location_prefix}LINE_002',
-                    'name': f'{location_prefix}Assembly Line 2',
-                    'status': random.choice(['running', 'idle', 'maintenance']),
-                    'efficiency': round(random.uniform(80.0, 98.0), 1),
-                    'output_rate': random.randint(40 if site == 'germany' else 35, 55 if site == 'germany' else 50),
-                    'target_rate': 50 if site == 'germany' else 45
-                },
-                {
-                    'id': f'{location_prefix}LINE_003',
-                    'name': f'{location_prefix}Packaging Line',
-                    'status': random.choice(['running', 'idle']),
-                    'efficiency': round(random.uniform(85.0, 99.0), 1),
-                    'output_rate': random.randint(80 if site == 'germany' else 75, 120 if site == 'germany' else 110),
-                    'target_rate': 100 if site == 'germany' else 95
-                },
-                {
-                    'id': f'{location_prefix}LINE_004',
-                    'name': f'{location_prefix}Quality Control',
-                    'status': random.choice(['running', 'idle', 'maintenance']),
-                    'efficiency': round(random.uniform(88.0, 99.5), 1),
-                    'output_rate': random.randint(35 if site == 'germany' else 30, 50 if site == 'germany' else 45),
-                    'target_rate': 45 if site == 'germany' else 40
-                },
-                {
-                    'id': f'{location_prefix}LINE_005',
-                    'name': f'{location_prefix}Testing Line',
-                    'status': random.choice(['running', 'idle']),
-                    'efficiency': round(random.uniform(82.0, 96.0), 1),
-                    'output_rate': random.randint(25 if site == 'germany' else 20, 40 if site == 'germany' else 35),
-                    'target_rate': 35 if site == 'germany' else 30
-                },
-                {
-                    'id': f'{location_prefix}LINE_006',
-                    'name': f'{location_prefix}Finishing Line',
-                    'status': random.choice(['running', 'idle', 'maintenance']),
-                    'efficiency': round(random.uniform(80.0, 95.0), 1),
-                    'output_rate': random.randint(60 if site == 'germany' else 55, 85 if site == 'germany' else 80),
-                    'target_rate': 75 if site == 'germany' else 70
+                    'id': line.id,
+                    'name': line.name,
+                    'status': random.choice(line.statuses),
+                    'efficiency': round(random.uniform(*line.efficiency_range), 1),
+                    'output_rate': random.randint(*line.output_range),
+                    'target_rate': line.target_rate
                 }
+                for line in profile.production_lines
             ],
             'quality_metrics': {
-                'defect_rate': round(random.uniform(0.1, 2.5 if site == 'uk' else 2.0), 2),
-                'first_pass_yield': round(random.uniform(quality_base - 2, quality_base + 2.8), 1),
-                'rework_rate': round(random.uniform(0.5, 3.0 if site == 'uk' else 2.5), 2)
+                'defect_rate': round(random.uniform(*profile.defect_rate_range), 2),
+                'first_pass_yield': round(random.uniform(*profile.first_pass_yield_range), 1),
+                'rework_rate': round(random.uniform(*profile.rework_rate_range), 2)
             }
         }
     
+    @timed('get_erp_data')
     def get_erp_data(self, site='germany'):
         """Generate mock ERP (Enterprise Resource Planning) data for specific site"""
-        site_info = self.sites.get(site, self.sites['germany'])
-        currency = site_info['currency']
-        
-        # Site-specific financial multipliers
-        revenue_multiplier = 1.0 if site == 'germany' else 0.85  # GBP typically lower numbers
-        cost_multiplier = 1.0 if site == 'germany' else 0.88
-        
-        # Site-specific inventory variations
-        inventory_multiplier = 1.2 if site == 'germany' else 1.0
+        profile = self.registry.get(site)
+        stock = profile.inventory_ranges
+        minimums = profile.inventory_minimums
+        finished = profile.finished_goods_ranges
         
         return {
             'inventory': {
                 'raw_materials': {
                     'steel_sheets': {
-                        'current_stock': random.randint(int(150 * inventory_multiplier), int(500 * inventory_multiplier)),
-                        'minimum_stock': int(200 * inventory_multiplier),
+                        'current_stock': random.randint(*stock['steel_sheets']),
+                        'minimum_stock': minimums['steel_sheets'],
                         'unit': 'sheets',
                         'status': 'adequate'
                     },
                     'aluminum_bars': {
-                        'current_stock': random.randint(int(50 * inventory_multiplier), int(200 * inventory_multiplier)),
-                        'minimum_stock': int(100 * inventory_multiplier),
+                        'current_stock': random.randint(*stock['aluminum_bars']),
+                        'minimum_stock': minimums['aluminum_bars'],
                         'unit': 'bars',
                         'status': random.choice(['low', 'adequate'])
                     },
                     'electronic_components': {
-                        'current_stock': random.randint(int(800 * inventory_multiplier), int(2000 * inventory_multiplier)),
-                        'minimum_stock': int(1000 * inventory_multiplier),
+                        'current_stock': random.randint(*stock['electronic_components']),
+                        'minimum_stock': minimums['electronic_components'],
                         'unit': 'pieces',
                         'status': 'adequate'
                     }
                 },
                 'finished_goods': {
-                    'product_a': random.randint(int(50 * inventory_multiplier), int(200 * inventory_multiplier)),
-                    'product_b': random.randint(int(30 * inventory_multiplier), int(150 * inventory_multiplier)),
-                    'product_c': random.randint(int(25 * inventory_multiplier), int(100 * inventory_multiplier))
+                    'product_a': random.randint(*finished['product_a']),
+                    'product_b': random.randint(*finished['product_b']),
+                    'product_c': random.randint(*finished['product_c'])
                 }
             },
             'financial_metrics': {
-                'daily_revenue': round(random.uniform(45000 * revenue_multiplier, 85000 * revenue_multiplier), 2),
-                'production_cost': round(random.uniform(25000 * cost_multiplier, 45000 * cost_multiplier), 2),
-                'efficiency_savings': round(random.uniform(2000 * revenue_multiplier, 8000 * revenue_multiplier), 2),
-                'target_revenue': int(75000 * revenue_multiplier),
-                'currency': currency
+                'daily_revenue': round(random.uniform(*profile.revenue_range), 2),
+                'production_cost': round(random.uniform(*profile.cost_range), 2),
+                'efficiency_savings': round(random.uniform(*profile.savings_range), 2),
+                'target_revenue': profile.target_revenue,
+                'currency': profile.currency
             },
             'supply_chain': {
-                'supplier_performance': round(random.uniform(85.0 if site == 'uk' else 88.0, 98.0), 1),
-                'delivery_delays': random.randint(0, 4 if site == 'uk' else 2),
-                'pending_orders': random.randint(5 if site == 'germany' else 8, 25 if site == 'germany' else 30)
+                'supplier_performance': round(random.uniform(*profile.supplier_performance_range), 1),
+                'delivery_delays': random.randint(*profile.delivery_delays_range),
+                'pending_orders': random.randint(*profile.pending_orders_range)
             }
         }
     
+    @timed('get_work_orders')
     def get_work_orders(self, site='germany'):
         """Generate mock work orders data for specific site"""
-        site_info = self.sites.get(site, self.sites['germany'])
-        location_prefix = site_info['location_prefix']
+        profile = self.registry.get(site)
         
         work_orders = []
         order_statuses = ['in_progress', 'pending', 'completed', 'on_hold']
         
-        # Site-specific product variations
-        products = ['Product A', 'Product B', 'Product C', 'Product D'] if site == 'germany' else ['Product X', 'Product Y', 'Product Z', 'Product W']
-        order_count = 8 if site == 'germany' else 6
-        
-        for i in range(order_count):
-            order_id = f"{location_prefix}WO{2024000 + i + 1}"
+        for order_id in profile.work_order_ids:
             status = random.choice(order_statuses)
             progress = 0
             
@@ -219,56 +189,214 @@ class DataService:
             
             work_orders.append({
                 'id': order_id,
-                'product': random.choice(products),
-                'quantity': random.randint(50 if site == 'germany' else 40, 500 if site == 'germany' else 400),
+                'product': random.choice(profile.products),
+                'quantity': random.randint(*profile.quantity_range),
                 'status': status,
                 'progress': progress,
                 'priority': random.choice(['high', 'medium', 'low']),
-                'assigned_line': f"{location_prefix}Line {random.randint(1, 3)}",
+                'assigned_line': random.choice(profile.work_order_lines),
                 'start_date': (datetime.now() - timedelta(days=random.randint(0, 7))).strftime('%Y-%m-%d'),
                 'due_date': (datetime.now() + timedelta(days=random.randint(1, 14))).strftime('%Y-%m-%d')
             })
         
         return work_orders
     
+    @timed('get_production_metrics')
     def get_production_metrics(self, site='germany'):
         """Generate mock production performance metrics for specific site"""
-        # Site-specific production targets and variations
-        target_base = 1000 if site == 'germany' else 850
-        production_variance = 0.15 if site == 'germany' else 0.18  # UK has slightly more variance
+        profile = self.registry.get(site)
         
         return {
             'daily_production': {
-                'target': target_base,
-                'actual': random.randint(int(target_base * (1 - production_variance)), int(target_base * (1 + production_variance))),
-                'efficiency': round(random.uniform(85.0 if site == 'uk' else 88.0, 105.0), 1)
+                'target': profile.target_base,
+                'actual': random.randint(*profile.actual_range),
+                'efficiency': round(random.uniform(*profile.production_efficiency_range), 1)
             },
             'weekly_trend': [
-                {'day': 'Mon', 'production': random.randint(int(target_base * 0.85), int(target_base * 1.1))},
-                {'day': 'Tue', 'production': random.randint(int(target_base * 0.85), int(target_base * 1.1))},
-                {'day': 'Wed', 'production': random.randint(int(target_base * 0.85), int(target_base * 1.1))},
-                {'day': 'Thu', 'production': random.randint(int(target_base * 0.85), int(target_base * 1.1))},
-                {'day': 'Fri', 'production': random.randint(int(target_base * 0.85), int(target_base * 1.1))},
-                {'day': 'Sat', 'production': random.randint(int(target_base * 0.6), int(target_base * 0.8))},
-                {'day': 'Sun', 'production': random.randint(int(target_base * 0.4), int(target_base * 0.6))}
+                {'day': 'Mon', 'production': random.randint(*profile.weekday_range)},
+                {'day': 'Tue', 'production': random.randint(*profile.weekday_range)},
+                {'day': 'Wed', 'production': random.randint(*profile.weekday_range)},
+                {'day': 'Thu', 'production': random.randint(*profile.weekday_range)},
+                {'day': 'Fri', 'production': random.randint(*profile.weekday_range)},
+                {'day': 'Sat', 'production': random.randint(*profile.saturday_range)},
+                {'day': 'Sun', 'production': random.randint(*profile.sunday_range)}
             ],
             'downtime': {
-                'total_minutes': random.randint(30 if site == 'germany' else 45, 180 if site == 'germany' else 210),
+                'total_minutes': random.randint(*profile.downtime_total_range),
                 'planned': random.randint(20, 60),
-                'unplanned': random.randint(10 if site == 'germany' else 15, 120 if site == 'germany' else 150)
+                'unplanned': random.randint(*profile.downtime_unplanned_range)
             }
         }
     
-    def get_historical_data(self, time_range, site='germany'):
-        """Generate mock historical data for charts for specific site"""
+    def sample_history(self, site='germany', load_section=None):
+        """Take one reading of every recorded metric for the time-series store"""
+        load_section = load_section or self.build_section
+        sensors = load_section('sensor_data', site)
+        mes = load_section('mes_data', site)
+        lines = mes['production_lines']
+        return {
+            'temperature': sensors['temperature']['value'],
+            'pressure': sensors['pressure']['value'],
+            'humidity': sensors['humidity']['value'],
+            'vibration': sensors['vibration']['value'],
+            'production_rate': sum(line['output_rate'] for line in lines) / len(lines),
+            'oee': mes['overall_equipment_effectiveness']['oee']
+        }
+    
+    def seed_history(self, site='germany', now=None):
+        """Backfill a year of hourly and a day of per-minute mock history for a fresh store"""
+        now = int(now if now is not None else time.time())
+        profile = self.registry.get(site)
+        
+        def rows(step, count):
+            for i in range(count):
+                ts = now - i * step
+                yield ('temperature', ts, round(random.uniform(*profile.history_temp_range), 1))
+                yield ('pressure', ts, round(random.uniform(*profile.history_pressure_range), 1))
+                yield ('production_rate', ts, random.randint(*profile.history_production_range))
+        
+        if self.history_store.seed(site, itertools.chain(rows(3600, 365 * 24), rows(60, 24 * 60))):
+            logging.info(f"Seeded mock history for {site}")
+    
+    @timed('get_historical_data')
+    def get_historical_data(self, time_range, site='germany', max_points=None, start=None, end=None):
+        """Get historical data for charts from the history store
+
+        Plain range requests read the range's rollup tier. With a point budget or a
+        start/end window (epoch seconds) the finest tier that fits the window is read
+        and the series is LTTB-downsampled to at most max_points.
+        """
+        self.registry.get(site)
+        if self.history_store is None:
+            return self.downsample_history(self._generate_historical_data(time_range, site), max_points)
+        if time_range not in self.HISTORY_RANGES:
+            return {'time_range': time_range, 'data_points': []}
+        
+        window, tier, label_format = self.HISTORY_RANGES[time_range]
+        now = time.time()
+        windowed = start is not None or end is not None
+        end = min(end, now) if end is not None else now
+        start = start if start is not None else end - window
+        if start >= end:
+            raise ValueError('start must be before end')
+        if windowed or max_points is not None:
+            tier = self.history_store.finest_tier(start, end, self.HISTORY_SCAN_LIMIT, now)
+            label_format = self.history_label_format(end - start)
+            if max_points is None:
+                max_points = self.DEFAULT_MAX_POINTS
+        
+        rows = self.history_store.query(site, self.HISTORY_METRICS, start, end, tier)
+        series = [[values[metric][0] if metric in values else None for _, values in rows] for metric in self.HISTORY_METRICS]
+        if max_points is not None and len(rows) > max_points:
+            # Downsample before formatting so only the kept points pay for labels and rounding
+            keep = lttb_indices([bucket for bucket, _ in rows], series, max_points)
+        else:
+            keep = range(len(rows))
+        
+        data_points = []
+        for i in keep:
+            bucket = rows[i][0]
+            point = {'timestamp': datetime.fromtimestamp(bucket).strftime(label_format), 'ts': bucket}
+            for metric, values in zip(self.HISTORY_METRICS, series):
+                point[metric] = round(values[i], 1) if values[i] is not None else None
+            data_points.append(point)
+        
+        return {
+            'time_range': time_range,
+            'data_points': data_points,
+            'total_points': len(rows),
+            'start': int(start),
+            'end': int(end),
+            'tier': tier
+        }
+    
+    def snap_history_window(self, time_range, start=None, end=None):
+        """Round a requested history window down to the bucket width of the tier it will read
+
+        Every start or end inside one bucket reads the same rows, so snapping
+        keeps near-identical windows on one cache entry. An end in the future
+        means now, like no end at all.
+        """
+        if self.history_store is None or time_range not in self.HISTORY_RANGES or (start is None and end is None):
+            return start, end
+        now = time.time()
+        if end is not None and end >= now:
+            end = None
+        window_end = end if end is not None else now
+        window_start = start if start is not None else window_end - self.HISTORY_RANGES[time_range][0]
+        if window_start >= window_end:
+            raise ValueError('start must be before end')
+        width = self.history_store.tier_width(
+            self.history_store.finest_tier(window_start, window_end, self.HISTORY_SCAN_LIMIT, now)
+        )
+        if start is not None:
+            start -= start % width
+        if end is not None:
+            end -= end % width
+            if start is not None and end <= start:
+                end = start + width
+        return start, end
+    
+    def export_history(self, site='germany', metrics=None, time_range='30d', start=None, end=None, resolution=None,
+                       batch_size=10000):
+        """Validate a history export and get its (resolution, start, end, row batches)
+
+        The resolution defaults to the finest tier still retained at start. Row
+        batches are read lazily, so nothing is fetched until they are iterated.
+        """
+        self.registry.get(site)
+        if self.history_store is None:
+            raise ValueError('History export needs the history store')
+        metrics = tuple(metrics) if metrics else self.RECORDED_METRICS
+        unknown = [metric for metric in metrics if metric not in self.RECORDED_METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+        if time_range not in self.HISTORY_RANGES:
+            raise ValueError(f"Unknown range: {time_range}")
+        resolutions = ('raw',) + tuple(tier.name for tier in self.history_store.TIERS)
+        if resolution is not None and resolution not in resolutions:
+            raise ValueError(f"resolution must be one of: {', '.join(resolutions)}")
+        
+        now = time.time()
+        end = min(end, now) if end is not None else now
+        start = start if start is not None else end - self.HISTORY_RANGES[time_range][0]
+        if start >= end:
+            raise ValueError('start must be before end')
+        if resolution is None:
+            resolution = self.history_store.finest_tier(start, end, float('inf'), now)
+        batches = self.history_store.iter_rows(site, metrics, start, end, resolution, batch_size)
+        return resolution, int(start), int(end), batches
+    
+    def history_label_format(self, span):
+        """Pick a timestamp label format readable at the scale of a window"""
+        if span <= 2 * 3600:
+            return '%H:%M:%S'
+        if span <= 86400:
+            return '%H:%M'
+        if span <= 8 * 86400:
+            return '%m/%d %H:%M'
+        return '%Y-%m-%d'
+    
+    def downsample_history(self, history, max_points=None):
+        """Reduce history data points to a point budget with LTTB, keeping the visual peaks"""
+        points = history['data_points']
+        total = len(points)
+        if max_points is not None and total > max_points:
+            x = [point.get('ts', i) for i, point in enumerate(points)]
+            series = [[point.get(metric) for point in points] for metric in self.HISTORY_METRICS]
+            history['data_points'] = [points[i] for i in lttb_indices(x, series, max_points)]
+        history['total_points'] = total
+        return history
+    
+    def _generate_historical_data(self, time_range, site='germany'):
+        """Generate mock historical data for charts when no history store is configured"""
+        profile = self.registry.get(site)
         now = datetime.now()
         data_points = []
         
-        # Site-specific ranges
-        temp_base = (20.0, 30.0) if site == 'germany' else (18.0, 28.0)
-        pressure_base = (15.0, 25.0) if site == 'germany' else (12.0, 22.0)
-        production_base_min = 50 if site == 'germany' else 45
-        production_base_max = 70 if site == 'germany' else 65
+        temp_base = profile.history_temp_range
+        pressure_base = profile.history_pressure_range
+        production_base_min, production_base_max = profile.history_production_range
         
         if time_range == '1h':
             # Generate data for last hour (every 5 minutes)
@@ -306,6 +434,24 @@ class DataService:
             'data_points': list(reversed(data_points))  # Reverse to show oldest first
         }
     
+    def resolve_snapshot_fields(self, fields=None):
+        """Validate a snapshot field selector, defaulting to every section"""
+        sections = tuple(fields) if fields else self.SNAPSHOT_SECTIONS
+        unknown = [name for name in sections if name not in self.SNAPSHOT_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown snapshot fields: {', '.join(unknown)}")
+        return sections
+    
+    def build_section(self, name, site='germany', time_range='24h'):
+        """Build a single dashboard section by name"""
+        if name == 'historical_data':
+            return self.get_historical_data(time_range, site)
+        return getattr(self, f'get_{name}')(site)
+    
+    def get_dashboard_snapshot(self, site='germany', fields=None, time_range='24h'):
+        """Build every requested dashboard section for a site in a single pass"""
+        return {name: self.build_section(name, site, time_range) for name in self.resolve_snapshot_fields(fields)}
+    
     def get_site_list(self):
         """Get available sites"""
         return self.sites
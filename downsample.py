@@ -0,0 +1,104 @@
+import math
+import warnings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def lttb_indices(x, series, threshold):
+    """Pick the indices Largest-Triangle-Three-Buckets keeps to draw series with `threshold` points
+
+    `x` is the shared, ascending x axis and `series` a list of y sequences of the
+    same length (None marks a gap). Every series is scaled to its own range and
+    the triangle areas are summed, so one index set serves all of them and a
+    peak in any series survives. The first and last points are always kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if np is not None:
+        return _lttb_numpy(x, series, threshold)
+    return _lttb_python(x, series, threshold)
+
+
+def _bucket_bounds(n, threshold):
+    # Interior points are split into threshold - 2 buckets of near-equal size
+    every = (n - 2) / (threshold - 2)
+    return [(int(i * every) + 1, int((i + 1) * every) + 1) for i in range(threshold - 2)]
+
+
+def _lttb_numpy(x, series, threshold):
+    xs = np.asarray(x, dtype=float)
+    # None becomes NaN on conversion to a float array
+    ys = np.array(series, dtype=float)
+    with warnings.catch_warnings():
+        # All-gap series produce NaN ranges and means; they simply contribute no area
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low = np.nanmin(ys, axis=1, keepdims=True)
+        span = np.nanmax(ys, axis=1, keepdims=True) - low
+        ys = (ys - low) / np.where(span > 0, span, 1.0)
+
+    bounds = _bucket_bounds(len(xs), threshold)
+    # The third triangle vertex is the next bucket's average, known up front for every bucket
+    next_bounds = bounds[1:] + [(len(xs) - 1, len(xs))]
+    starts = np.array([lo for lo, _ in next_bounds])
+    sizes = np.array([hi - lo for lo, hi in next_bounds])
+    present = ~np.isnan(ys)
+    with np.errstate(all='ignore'):
+        next_x = np.add.reduceat(xs, starts) / sizes
+        next_y = np.add.reduceat(np.where(present, ys, 0.0), starts, axis=1) / np.add.reduceat(present, starts, axis=1)
+
+    selected = [0]
+    a = 0
+    for i, (lo, hi) in enumerate(bounds):
+        # Twice the triangle area (a, candidate, next average) for every candidate in the bucket, per series
+        area = np.abs(
+            (xs[a] - next_x[i]) * (ys[:, lo:hi] - ys[:, a:a + 1])
+            - (xs[a] - xs[lo:hi]) * (next_y[:, i:i + 1] - ys[:, a:a + 1])
+        )
+        a = lo + int(np.argmax(np.nansum(area, axis=0)))
+        selected.append(a)
+    selected.append(len(xs) - 1)
+    return selected
+
+
+def _lttb_python(x, series, threshold):
+    ranges = []
+    for values in series:
+        present = [v for v in values if v is not None]
+        low = min(present) if present else 0.0
+        span = (max(present) - low) if present else 0.0
+        ranges.append((low, span or 1.0))
+    ys = [
+        [math.nan if v is None else (v - low) / span for v in values]
+        for values, (low, span) in zip(series, ranges)
+    ]
+
+    def mean(values):
+        present = [v for v in values if not math.isnan(v)]
+        return sum(present) / len(present) if present else math.nan
+
+    n = len(x)
+    bounds = _bucket_bounds(n, threshold)
+    next_bounds = bounds[1:] + [(n - 1, n)]
+
+    selected = [0]
+    a = 0
+    for (lo, hi), (next_lo, next_hi) in zip(bounds, next_bounds):
+        cx = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+        cys = [mean(values[next_lo:next_hi]) for values in ys]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = 0.0
+            for values, cy in zip(ys, cys):
+                term = abs((x[a] - cx) * (values[j] - values[a]) - (x[a] - x[j]) * (cy - values[a]))
+                if not math.isnan(term):
+                    area += term
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        selected.append(a)
+    selected.append(n - 1)
+    return selected
@@ -0,0 +1,114 @@
+import csv
+import io
+import logging
+
+from responses import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+COLUMNS = ('metric', 'ts', 'value', 'min', 'max', 'count')
+
+# format -> (mimetype, file extension, rows per batch); Parquet writes each batch as one row group
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv', 10000),
+    'ndjson': ('application/x-ndjson', 'ndjson', 10000),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', 65536)
+}
+
+
+def check_format(export_format):
+    """Reject unknown formats, and Parquet when pyarrow is not installed"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet' and pa is None:
+        raise ValueError('Parquet export requires pyarrow (pip install pyarrow)')
+
+
+def export_chunks(export_format, batches):
+    """Encode row batches as a stream of byte chunks, one chunk per batch
+
+    Only the batch being encoded is held in memory, so the size of an export is
+    bounded by the client, not the server.
+    """
+    encode = {'csv': csv_chunks, 'ndjson': ndjson_chunks, 'parquet': parquet_chunks}[export_format]
+    try:
+        yield from encode(batches)
+    except Exception as e:
+        # Headers are long gone; dropping the connection is how the client learns the export is incomplete
+        logging.error(f"Error streaming {export_format} export: {str(e)}")
+        raise
+    finally:
+        batches.close()
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: the export matched no rows
+        yield buffer.getvalue().encode('utf-8')
+
+
+def ndjson_chunks(batches):
+    for rows in batches:
+        yield b''.join(dumps(dict(zip(COLUMNS, row))) + b'\n' for row in rows)
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that hands everything written so far to the caller on drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(batches):
+    schema = pa.schema([
+        ('metric', pa.string()),
+        ('ts', pa.timestamp('s', tz='UTC')),
+        ('value', pa.float64()),
+        ('min', pa.float64()),
+        ('max', pa.float64()),
+        ('count', pa.int64())
+    ])
+    sink = ChunkSink()
+    # Each batch becomes its own row group, written out before the next one is read
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,284 @@
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+import logging
+
+import numpy as np
+
+from connectors import Connector
+from site_registry import FleetConfig, SiteRegistry
+
+
+class SiteLayout:
+    """Per-site distribution arrays precomputed from a fleet site's profile"""
+
+    __slots__ = (
+        'sensor_kind', 'sensor_low', 'sensor_high', 'sensor_spread', 'kind_low', 'kind_high',
+        'kpi_low', 'kpi_high',
+        'line_status_count', 'line_efficiency_low', 'line_efficiency_high', 'line_output_low', 'line_output_count',
+        'line_statuses', 'line_ids', 'line_names', 'line_targets',
+        'order_count', 'quantity_low', 'quantity_high', 'product_count', 'order_line_count'
+    )
+
+    def __init__(self, profile, spread):
+        ranges = np.array([profile.temp_range, profile.pressure_range, profile.humidity_range, profile.vibration_range])
+        self.sensor_kind = np.arange(profile.fleet_sensors) % len(ranges)
+        self.kind_low, self.kind_high = ranges[:, 0], ranges[:, 1]
+        self.sensor_low = self.kind_low[self.sensor_kind]
+        self.sensor_high = self.kind_high[self.sensor_kind]
+        self.sensor_spread = (self.sensor_high - self.sensor_low) * spread
+
+        # OEE, availability, performance, quality, defect rate, first pass yield, rework rate
+        kpi_ranges = np.array([
+            profile.oee_range, (85.0, 98.0), (80.0, 95.0), profile.quality_range,
+            profile.defect_rate_range, profile.first_pass_yield_range, profile.rework_rate_range
+        ])
+        self.kpi_low, self.kpi_high = kpi_ranges[:, 0], kpi_ranges[:, 1]
+
+        lines = profile.production_lines
+        self.line_status_count = np.array([len(line.statuses) for line in lines])
+        self.line_efficiency_low = np.array([line.efficiency_range[0] for line in lines])
+        self.line_efficiency_high = np.array([line.efficiency_range[1] for line in lines])
+        self.line_output_low = np.array([line.output_range[0] for line in lines])
+        self.line_output_count = np.array([line.output_range[1] - line.output_range[0] + 1 for line in lines])
+        self.line_statuses = [line.statuses for line in lines]
+        self.line_ids = [line.id for line in lines]
+        self.line_names = [line.name for line in lines]
+        self.line_targets = [line.target_rate for line in lines]
+
+        self.order_count = profile.work_order_count
+        self.quantity_low, self.quantity_high = profile.quantity_range
+        self.product_count = len(profile.products)
+        self.order_line_count = len(profile.work_order_lines)
+
+
+class SiteTick:
+    """Column arrays for one generated tick of one site"""
+
+    __slots__ = (
+        'sensor_values', 'kpis', 'line_status', 'line_efficiency', 'line_output',
+        'order_status', 'order_progress', 'order_quantity', 'order_priority',
+        'order_product', 'order_line', 'order_start_offset', 'order_due_offset'
+    )
+
+
+class FleetGenerator:
+    """Vectorized mock data engine generating every simulated fleet site per tick with NumPy
+
+    Sizes and distributions come from the fleet sites' registry profiles. Every
+    site has its own seeded RNG stream, so a site's data is reproducible
+    regardless of fleet size. Each metric column is drawn in a single call and
+    arrays are only converted to the dashboard's JSON shapes at the edge.
+    """
+
+    SENSOR_KINDS = ('temperature', 'pressure', 'humidity', 'vibration')
+    SENSOR_UNITS = ('°C', 'bar', '%', 'mm/s')
+    SENSOR_DECIMALS = (1, 2, 1, 2)
+    # Sensors of one kind scatter around a shared site level by this fraction of their range
+    SENSOR_SPREAD = 0.02
+    ORDER_STATUSES = ('in_progress', 'pending', 'completed', 'on_hold')
+    PRIORITIES = ('high', 'medium', 'low')
+
+    def __init__(self, profiles, seed=2024):
+        self.profiles = list(profiles)
+        self.site_index = {profile.key: i for i, profile in enumerate(self.profiles)}
+        sequence = np.random.SeedSequence(seed)
+        self.rngs = [np.random.default_rng(child) for child in sequence.spawn(len(self.profiles))]
+        self.layouts = [SiteLayout(profile, self.SENSOR_SPREAD) for profile in self.profiles]
+        logging.info(f"FleetGenerator initialized ({len(self.profiles)} sites)")
+
+    def __contains__(self, site):
+        return site in self.site_index
+
+    def tick(self):
+        """Generate one tick of column arrays for every site"""
+        return [self._site_tick(layout, rng) for layout, rng in zip(self.layouts, self.rngs)]
+
+    def _site_tick(self, layout, rng):
+        lines = len(layout.line_ids)
+        orders = layout.order_count
+        tick = SiteTick()
+
+        level = rng.uniform(layout.kind_low, layout.kind_high)
+        tick.sensor_values = np.clip(
+            level[layout.sensor_kind] + rng.standard_normal(len(layout.sensor_kind)) * layout.sensor_spread,
+            layout.sensor_low, layout.sensor_high
+        )
+        tick.kpis = rng.uniform(layout.kpi_low, layout.kpi_high)
+
+        tick.line_status = (rng.random(lines) * layout.line_status_count).astype(np.int64)
+        tick.line_efficiency = np.round(rng.uniform(layout.line_efficiency_low, layout.line_efficiency_high), 1)
+        tick.line_output = layout.line_output_low + (rng.random(lines) * layout.line_output_count).astype(np.int64)
+
+        status = rng.integers(0, len(self.ORDER_STATUSES), orders)
+        draw = rng.random(orders)
+        # in_progress 10-90, on_hold 20-60, completed 100, pending 0
+        tick.order_progress = np.select(
+            [status == 0, status == 3, status == 2],
+            [10 + (draw * 81).astype(np.int64), 20 + (draw * 41).astype(np.int64), 100],
+            0
+        )
+        tick.order_status = status
+        tick.order_quantity = rng.integers(layout.quantity_low, layout.quantity_high + 1, orders)
+        tick.order_priority = rng.integers(0, len(self.PRIORITIES), orders)
+        tick.order_product = rng.integers(0, layout.product_count, orders)
+        tick.order_line = rng.integers(0, layout.order_line_count, orders)
+        tick.order_start_offset = rng.integers(0, 8, orders)
+        tick.order_due_offset = rng.integers(1, 15, orders)
+        return tick
+
+    def site_sensor_data(self, tick, site):
+        """Convert one site's sensors to the sensor_data shape, reporting each kind's highest reading"""
+        i = self.site_index[site]
+        profile = self.profiles[i]
+        values = tick[i].sensor_values
+        section = {}
+        for k, (kind, unit, decimals) in enumerate(zip(self.SENSOR_KINDS, self.SENSOR_UNITS, self.SENSOR_DECIMALS)):
+            readings = values[k::len(self.SENSOR_KINDS)]
+            hottest = int(readings.argmax())
+            value = round(float(readings[hottest]), decimals)
+            section[kind] = {
+                'value': value,
+                'unit': unit,
+                'status': profile.sensor_status(kind, value),
+                'location': f'{profile.sensor_locations[kind]} #{hottest + 1}'
+            }
+        return section
+
+    def site_mes_data(self, tick, site):
+        """Convert one site's lines, OEE and quality to the mes_data shape"""
+        i = self.site_index[site]
+        layout = self.layouts[i]
+        site_tick = tick[i]
+        oee, availability, performance, quality, defect_rate, first_pass_yield, rework_rate = site_tick.kpis.tolist()
+        rows = zip(
+            layout.line_ids, layout.line_names, layout.line_statuses, site_tick.line_status.tolist(),
+            site_tick.line_efficiency.tolist(), site_tick.line_output.tolist(), layout.line_targets
+        )
+        return {
+            'overall_equipment_effectiveness': {
+                'oee': round(oee, 1),
+                'availability': round(availability, 1),
+                'performance': round(performance, 1),
+                'quality': round(quality, 1)
+            },
+            'production_lines': [
+                {
+                    'id': line_id,
+                    'name': name,
+                    'status': statuses[status],
+                    'efficiency': efficiency,
+                    'output_rate': output,
+                    'target_rate': target
+                }
+                for line_id, name, statuses, status, efficiency, output, target in rows
+            ],
+            'quality_metrics': {
+                'defect_rate': round(defect_rate, 2),
+                'first_pass_yield': round(first_pass_yield, 1),
+                'rework_rate': round(rework_rate, 2)
+            }
+        }
+
+    def site_work_orders(self, tick, site):
+        """Convert one site's work orders to the work_orders shape"""
+        i = self.site_index[site]
+        profile = self.profiles[i]
+        site_tick = tick[i]
+        today = datetime.now()
+        # Offsets are small integers, so format each distinct date once
+        start_dates = [(today - timedelta(days=d)).strftime('%Y-%m-%d') for d in range(8)]
+        due_dates = [(today + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(15)]
+        rows = zip(
+            profile.work_order_ids,
+            site_tick.order_status.tolist(),
+            site_tick.order_progress.tolist(),
+            site_tick.order_quantity.tolist(),
+            site_tick.order_priority.tolist(),
+            site_tick.order_product.tolist(),
+            site_tick.order_line.tolist(),
+            site_tick.order_start_offset.tolist(),
+            site_tick.order_due_offset.tolist()
+        )
+        return [
+            {
+                'id': order_id,
+                'product': profile.products[product],
+                'quantity': quantity,
+                'status': self.ORDER_STATUSES[status],
+                'progress': progress,
+                'priority': self.PRIORITIES[priority],
+                'assigned_line': profile.work_order_lines[line],
+                'start_date': start_dates[start],
+                'due_date': due_dates[due]
+            }
+            for order_id, status, progress, quantity, priority, product, line, start, due in rows
+        ]
+
+
+class FleetConnector(Connector):
+    """Serves fleet sites' live sections from one shared fleet tick, and every other site from a fallback
+
+    The whole fleet is regenerated at most once per interval, however many
+    sites and sections are fetched in between.
+    """
+
+    name = 'fleet'
+    DOMAINS = ('sensor_data', 'mes_data', 'work_orders')
+
+    def __init__(self, generator, fallback, interval=2.0, timeout=2.0):
+        self.generator = generator
+        self.fallback = fallback
+        self.interval = interval
+        self.timeout = timeout
+        self._tick = None
+        self._ticked_at = None
+        self._lock = threading.Lock()
+
+    def current_tick(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._tick is None or now - self._ticked_at >= self.interval:
+                self._tick = self.generator.tick()
+                self._ticked_at = now
+            return self._tick
+
+    def fetch(self, domain, site):
+        if site not in self.generator:
+            return self.fallback.fetch(domain, site)
+        return getattr(self.generator, f'site_{domain}')(self.current_tick(), site)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time fleet tick generation for a registry-derived fleet')
+    parser.add_argument('--sites', type=int, default=50)
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--sensors', type=int, default=2000)
+    parser.add_argument('--work-orders', type=int, default=500)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=2024)
+    args = parser.parse_args()
+
+    registry = SiteRegistry.load(fleet=FleetConfig(args.sites, args.lines, args.sensors, args.work_orders, args.seed))
+    generator = FleetGenerator(registry.fleet_profiles(), args.seed)
+    generator.tick()
+
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        tick = generator.tick()
+    per_tick = (time.perf_counter() - started) / args.ticks * 1000
+
+    site = generator.profiles[0].key
+    started = time.perf_counter()
+    generator.site_sensor_data(tick, site)
+    generator.site_mes_data(tick, site)
+    generator.site_work_orders(tick, site)
+    per_site_edge = (time.perf_counter() - started) * 1000
+
+    print(f"fleet tick: {per_tick:.2f} ms ({args.sites} sites x {args.lines} lines x {args.sensors} sensors)")
+    print(f"JSON-shape conversion for one site: {per_site_edge:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import logging
+
+
+class FleetSummary:
+    """Gathers per-site KPIs concurrently and computes cross-site aggregates in the same pass"""
+
+    def __init__(self, load_section, site_names, max_workers=8, timeout=2.0, worst_lines=5):
+        self.load_section = load_section
+        self.site_names = site_names
+        self.timeout = timeout
+        self.worst_lines = worst_lines
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='site-summary')
+
+    def site_summary(self, site):
+        """Collect OEE, daily production, downtime and line efficiencies for one site"""
+        mes = self.load_section('mes_data', site)
+        production = self.load_section('production_metrics', site)
+        return {
+            'name': self.site_names[site]['name'],
+            'status': 'ok',
+            'oee': mes['overall_equipment_effectiveness']['oee'],
+            'daily_production': production['daily_production'],
+            'downtime': production['downtime'],
+            'production_lines': [
+                {'id': line['id'], 'name': line['name'], 'status': line['status'], 'efficiency': line['efficiency']}
+                for line in mes['production_lines']
+            ]
+        }
+
+    def summarize(self, sites=None):
+        """Fan out to every site on the pool, returning partial results when a site is slow or failing"""
+        sites = list(sites or self.site_names)
+        futures = {site: self._executor.submit(self.site_summary, site) for site in sites}
+        deadline = time.monotonic() + self.timeout
+
+        results = {}
+        for site, future in futures.items():
+            try:
+                results[site] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                logging.warning(f"Site summary for {site} timed out after {self.timeout}s")
+                results[site] = {'status': 'timeout', 'error': f'No response within {self.timeout}s'}
+            except Exception as e:
+                logging.error(f"Error building site summary for {site}: {str(e)}")
+                results[site] = {'status': 'error', 'error': 'Failed to fetch site data'}
+
+        return {
+            'sites': results,
+            'aggregates': self.aggregate(results),
+            'complete': all(result['status'] == 'ok' for result in results.values())
+        }
+
+    def aggregate(self, results):
+        """Compute fleet OEE, total output against target and the worst lines across healthy sites"""
+        healthy = {site: result for site, result in results.items() if result['status'] == 'ok'}
+        total_actual = sum(r['daily_production']['actual'] for r in healthy.values())
+        total_target = sum(r['daily_production']['target'] for r in healthy.values())
+
+        # Weight each site's OEE by its output so large sites count proportionally
+        fleet_oee = None
+        if total_actual:
+            fleet_oee = round(
+                sum(r['oee'] * r['daily_production']['actual'] for r in healthy.values()) / total_actual, 1
+            )
+
+        lines = [
+            dict(line, site=site)
+            for site, result in healthy.items()
+            for line in result['production_lines']
+        ]
+        lines.sort(key=lambda line: line['efficiency'])
+
+        return {
+            'sites_reporting': len(healthy),
+            'sites_total': len(results),
+            'fleet_oee': fleet_oee,
+            'total_output': total_actual,
+            'total_target': total_target,
+            'target_achievement': round(total_actual / total_target * 100, 1) if total_target else None,
+            'total_downtime_minutes': sum(r['downtime']['total_minutes'] for r in healthy.values()),
+            'unplanned_downtime_minutes': sum(r['downtime']['unplanned'] for r in healthy.values()),
+            'worst_lines': lines[:self.worst_lines]
+        }
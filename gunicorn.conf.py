@@ -0,0 +1,54 @@
+"""Production serving profile: gunicorn -c gunicorn.conf.py main:app
+
+Workers share cached sections, snapshot versions and alert silences through a
+local SQLite database in WAL mode, so every worker serves the same data and each
+section is regenerated once per tick by whichever worker holds its lease.
+
+Workers are gevent by default, so open event streams cost a greenlet each
+rather than a thread; WORKER_CLASS=gthread keeps a synchronous thread pool.
+"""
+import multiprocessing
+import os
+
+# Must be set before the app is imported (preload happens after this file is read)
+os.environ.setdefault('SHARED_STATE_PATH', 'factory_shared.db')
+os.environ['DEFER_BACKGROUND_START'] = '1'
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# Every open /api/stream connection stays open for as long as a screen is up. Under
+# gevent each one is a greenlet, so a worker holds up to worker_connections of them and
+# keeps answering API requests. Under gthread each stream holds one of the worker's
+# `threads`, and once they are all streaming the worker answers nothing else.
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 9)))
+worker_class = os.environ.get('WORKER_CLASS', 'gevent')
+threads = int(os.environ.get('WORKER_THREADS', '8'))
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '2000'))
+
+# gevent monkey-patches threading, socket and time as each worker starts. The app
+# creates locks, executors and threads at import, so under gevent every worker imports
+# it after patching instead of inheriting a preloaded copy from the master. Synchronous
+# workers import it once in the master and fork.
+async_worker = worker_class in ('gevent', 'eventlet') or 'ggevent' in worker_class
+preload_app = not async_worker and os.environ.get('PRELOAD_APP', '1') == '1'
+
+timeout = int(os.environ.get('WORKER_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then, with jitter so they do not all restart together
+max_requests = int(os.environ.get('MAX_REQUESTS', '20000'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('ACCESS_LOG')
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    """Start source refresh, history recording and alert monitoring threads in the new worker
+
+    Runs after the worker has loaded the app, and under gevent after patching, so
+    these are greenlets there.
+    """
+    from routes import start_background
+    start_background()
@@ -0,0 +1,81 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import time
+from flask import g, request
+import logging
+
+import metrics
+
+REQUEST_SECONDS = metrics.registry.histogram(
+    'factory_http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method', 'status')
+)
+REQUESTS_IN_FLIGHT = metrics.registry.gauge(
+    'factory_http_requests_in_flight', 'HTTP requests currently being handled'
+)
+RESPONSE_BYTES = metrics.registry.counter(
+    'factory_http_response_bytes_total', 'Response payload bytes sent by route', ('route',)
+)
+
+# Admins opt in to per-request profiles with ?profile=1 plus this token in the X-Profile-Token header
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+
+
+def instrument_app(app):
+    """Attach request timing, in-flight and payload metrics plus the opt-in profiler to an app"""
+    in_flight = REQUESTS_IN_FLIGHT.labels()
+
+    @app.before_request
+    def start_request():
+        if profiling_requested():
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+        if metrics.ENABLED:
+            g.request_started = time.perf_counter()
+            in_flight.inc()
+
+    @app.after_request
+    def finish_request(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            response = profile_response(app, profiler)
+
+        started = g.pop('request_started', None)
+        if started is not None:
+            in_flight.dec()
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_SECONDS.labels(route, request.method, str(response.status_code)).observe(
+                time.perf_counter() - started
+            )
+            if not response.is_streamed:
+                RESPONSE_BYTES.labels(route).inc(response.content_length or 0)
+        return response
+
+    @app.teardown_request
+    def abort_request(error):
+        # after_request is skipped on unhandled errors; keep the in-flight gauge honest
+        if g.pop('request_started', None) is not None:
+            in_flight.dec()
+
+
+def profiling_requested():
+    if PROFILE_TOKEN is None or request.args.get('profile') != '1':
+        return False
+    # Header only: a query-string token would be written to access and proxy logs
+    token = request.headers.get('X-Profile-Token') or ''
+    # Constant-time; compared as UTF-8 bytes, since compare_digest rejects non-ASCII str
+    if not hmac.compare_digest(token.encode('utf-8'), PROFILE_TOKEN.encode('utf-8')):
+        logging.warning(f"Rejected profile request for {request.path} with a missing or bad token")
+        return False
+    return True
+
+
+def profile_response(app, profiler, limit=40):
+    """Replace a response with the cProfile breakdown of the request that produced it"""
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats('cumulative').print_stats(limit)
+    return app.response_class(output.getvalue(), mimetype='text/plain')
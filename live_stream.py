@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+import logging
+
+
+class Subscription:
+    """A single SSE client with a bounded frame queue"""
+
+    __slots__ = ('frames', 'wakeup')
+
+    def __init__(self, max_pending):
+        # Oldest frames fall off when a slow consumer falls behind
+        self.frames = deque(maxlen=max_pending)
+        self.wakeup = threading.Event()
+
+    def push(self, frame):
+        self.frames.append(frame)
+        self.wakeup.set()
+
+    def drain(self):
+        self.wakeup.clear()
+        pending = []
+        while self.frames:
+            pending.append(self.frames.popleft())
+        return pending
+
+
+class SiteBroadcaster:
+    """Background producer for one site that fans each update out to every subscriber
+
+    `build(site)` returns `(event_id, full_body, delta_body)`; subscribers normally
+    receive the delta and new or reconnecting clients receive the full body.
+    """
+
+    def __init__(self, site, build, interval, idle_timeout):
+        self.site = site
+        self.build = build
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.last_event_id = 0
+        self.last_frame = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, max_pending, last_event_id=None):
+        """Register a client, replaying the latest frame unless it has already seen it"""
+        subscription = Subscription(max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self.last_frame is not None and last_event_id != str(self.last_event_id):
+                subscription.push(self.last_frame)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'stream-{self.site}', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event_id, full_body, delta_body=None):
+        """Fan one update out to every subscriber, keeping the full frame for late joiners"""
+        with self._lock:
+            if event_id == self.last_event_id:
+                # Snapshot has not changed since the last tick
+                return
+            self.last_event_id = event_id
+            self.last_frame = b'id: %d\nevent: snapshot\ndata: %s\n\n' % (event_id, full_body)
+            if delta_body is None:
+                frame = self.last_frame
+            else:
+                frame = b'id: %d\nevent: patch\ndata: %s\n\n' % (event_id, delta_body)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(frame)
+
+    def _run(self):
+        idle_since = None
+        while True:
+            with self._lock:
+                if self._subscribers:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since >= self.idle_timeout:
+                    # Stop producing for sites nobody is watching
+                    self._thread = None
+                    logging.info(f"Stream producer for {self.site} stopped (no subscribers)")
+                    return
+
+            if idle_since is None:
+                try:
+                    self.publish(*self.build(self.site))
+                except Exception as e:
+                    logging.error(f"Error producing stream update for {self.site}: {str(e)}")
+            time.sleep(self.interval)
+
+
+class LiveStream:
+    """Registry of per-site broadcasters serving Server-Sent Events"""
+
+    def __init__(self, build, interval=2.0, heartbeat=15.0, max_pending=4, idle_timeout=60.0, retry_ms=5000):
+        self.build = build
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.max_pending = max_pending
+        self.idle_timeout = idle_timeout
+        self.retry_ms = retry_ms
+        self._broadcasters = {}
+        self._lock = threading.Lock()
+
+    def broadcaster(self, site):
+        with self._lock:
+            broadcaster = self._broadcasters.get(site)
+            if broadcaster is None:
+                broadcaster = SiteBroadcaster(site, self.build, self.interval, self.idle_timeout)
+                self._broadcasters[site] = broadcaster
+            return broadcaster
+
+    def events(self, site, last_event_id=None):
+        """Yield encoded SSE frames for one client until it disconnects"""
+        broadcaster = self.broadcaster(site)
+        subscription = broadcaster.subscribe(self.max_pending, last_event_id)
+        try:
+            yield b'retry: %d\n\n' % self.retry_ms
+            while True:
+                if not subscription.wakeup.wait(self.heartbeat):
+                    yield b': heartbeat\n\n'
+                    continue
+                for frame in subscription.drain():
+                    yield frame
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    def stats(self):
+        """Get subscriber counts and last event id per site"""
+        with self._lock:
+            broadcasters = list(self._broadcasters.values())
+        return {
+            b.site: {'subscribers': b.subscriber_count(), 'last_event_id': b.last_event_id}
+            for b in broadcasters
+        }
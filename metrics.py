@@ -0,0 +1,346 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+import logging
+
+# Instrumentation is decided once at import; when disabled, decorators return the original function
+ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Metric:
+    """Base class for a named metric family with optional labels"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Get the child series for a set of label values"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def family(self):
+        """Get this metric's current samples as a plain, JSON-serializable family"""
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'help': self.documentation,
+            'labels': list(self.labelnames),
+            'aggregate': 'sum',
+            'samples': [[list(values), self._sample(child)] for values, child in sorted(self._children.items())]
+        }
+
+    def _sample(self, child):
+        return child.value
+
+
+class CounterValue:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return CounterValue()
+
+
+class GaugeValue(CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount=1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return GaugeValue()
+
+
+class HistogramValue:
+    __slots__ = ('buckets', 'counts', 'count', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return HistogramValue(self.buckets)
+
+    def family(self):
+        family = super().family()
+        family['buckets'] = list(self.buckets)
+        return family
+
+    def _sample(self, child):
+        with child._lock:
+            return [list(child.counts), child.sum, child.count]
+
+
+class MetricsRegistry:
+    """Holds metric families and scrape-time collectors, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """Register a callable returning (name, kind, documentation, labelnames, {labels tuple: value}) families
+
+        A family may carry a sixth element saying how workers' values combine:
+        'sum' (the default), 'max', 'mean', or 'latest' for values every worker
+        reads from shared state.
+        """
+        self._collectors.append(collect)
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def families(self):
+        """Get every registered and collected family as plain, JSON-serializable data"""
+        families = [metric.family() for metric in self._metrics]
+        for collect in self._collectors:
+            for name, kind, documentation, labelnames, samples, *aggregate in collect():
+                families.append({
+                    'name': name,
+                    'kind': kind,
+                    'help': documentation,
+                    'labels': list(labelnames),
+                    'aggregate': aggregate[0] if aggregate else 'sum',
+                    'samples': [[list(values), value] for values, value in samples.items()]
+                })
+        return families
+
+    def render(self):
+        return render_families(self.families())
+
+
+def render_families(families):
+    """Render families in Prometheus text exposition format"""
+    lines = []
+    for family in families:
+        name, labelnames = family['name'], tuple(family['labels'])
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        for values, value in family['samples']:
+            values = tuple(values)
+            labels = format_labels(labelnames, values)
+            if family['kind'] != 'histogram':
+                lines.append(f'{name}{labels} {value}')
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(family['buckets'] + [float('inf')], counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{format_labels(labelnames + ('le',), values + (le,))} {cumulative}")
+            lines.append(f'{name}_sum{labels} {total}')
+            lines.append(f'{name}_count{labels} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def cumulative(family):
+    """Whether a family's values add up over a process lifetime, and so outlive the process"""
+    return family['kind'] in ('counter', 'histogram') and family['aggregate'] == 'sum'
+
+
+def merge_families(sources):
+    """Combine the families of several processes into one set
+
+    `sources` are (families, fresh) pairs, most recently published first.
+    Cumulative families add up over every source; gauges and shared values
+    only count fresh sources, combined by each family's aggregate.
+    """
+    merged = {}
+    collected = {}
+    for families, fresh in sources:
+        for family in families:
+            if not fresh and not cumulative(family):
+                continue
+            name = family['name']
+            if name not in merged:
+                merged[name] = dict(family, samples=[])
+                collected[name] = {}
+            samples = collected[name]
+            for values, value in family['samples']:
+                samples.setdefault(tuple(values), []).append(value)
+
+    for name, family in merged.items():
+        aggregate = family['aggregate']
+        for values, found in collected[name].items():
+            if family['kind'] == 'histogram':
+                value = [
+                    [sum(counts) for counts in zip(*(v[0] for v in found))],
+                    sum(v[1] for v in found),
+                    sum(v[2] for v in found)
+                ]
+            elif aggregate == 'max':
+                value = max(found)
+            elif aggregate == 'mean':
+                value = sum(found) / len(found)
+            elif aggregate == 'latest':
+                value = found[0]
+            else:
+                value = sum(found)
+            family['samples'].append([list(values), value])
+    return list(merged.values())
+
+
+class SharedMetrics:
+    """Serves /metrics for every worker process at once through the shared state store
+
+    Each worker publishes its own families every `interval` seconds and when it
+    is scraped, so whichever worker a scrape lands on renders the combined
+    values. Counters and histograms of workers that have exited are folded into
+    a retired total, so totals never go backwards when workers are recycled.
+    """
+
+    def __init__(self, registry, store, interval=1.0, stale_after=30.0):
+        self.registry = registry
+        self.store = store
+        self.interval = interval
+        self.stale_after = stale_after
+        self._published_pid = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='metrics-publisher', daemon=True)
+            self._thread.start()
+
+    def publish(self):
+        worker = str(os.getpid())
+        if self._published_pid != worker:
+            # A row under our pid left by an earlier process holds its totals, not ours
+            self.store.retire_worker_metrics(worker, self.fold)
+            self._published_pid = worker
+        self.store.put_worker_metrics(worker, self.registry.families())
+
+    @staticmethod
+    def fold(retired, families):
+        return merge_families([(retired, True), ([family for family in families if cumulative(family)], True)])
+
+    def render(self):
+        self.publish()
+        now = time.time()
+        sources = []
+        for worker, updated_at, families in sorted(self.store.worker_metrics(), key=lambda row: -row[1]):
+            if not process_alive(int(worker)):
+                self.store.retire_worker_metrics(worker, self.fold)
+            else:
+                sources.append((families, now - updated_at <= self.stale_after))
+        retired = self.store.retired_metrics()
+        if retired:
+            sources.append((retired, False))
+        return render_families(merge_families(sources))
+
+    def _run(self):
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logging.error(f"Error publishing worker metrics: {str(e)}")
+            time.sleep(self.interval)
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+registry = MetricsRegistry()
+
+GENERATOR_SECONDS = registry.histogram(
+    'factory_generator_duration_seconds', 'Time spent building a data section', ('generator',),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+
+
+def timed(name):
+    """Record a function's duration in the generator histogram (no-op wrapper when disabled)"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+        series = GENERATOR_SECONDS.labels(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the framing overhead is not worth it
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+
+
+def dumps(obj):
+    """Serialize to compact UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON bytes produced by dumps()"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify provider backed by dumps(), compact even in debug mode"""
+
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and kwargs.get('indent') is None and not self.sort_keys:
+            return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+
+class EncodedJSON:
+    """A serialized success envelope with a content-hash entity tag and memoized compressed variants"""
+
+    __slots__ = ('body', 'etag', '_compressed', '_lock')
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self._compressed = {}
+        self._lock = threading.Lock()
+
+    def compressed(self, encoding):
+        """Get the body compressed with 'br' or 'gzip', compressing at most once per encoding"""
+        data = self._compressed.get(encoding)
+        if data is None:
+            if encoding == 'br':
+                data = brotli.compress(self.body, quality=5)
+            else:
+                data = gzip.compress(self.body, compresslevel=6)
+            with self._lock:
+                self._compressed.setdefault(encoding, data)
+        return data
+
+
+def encode_envelope(payload, timestamp):
+    """Serialize a payload in the standard success envelope
+
+    The ETag hashes the data only, so an unchanged payload keeps its ETag even
+    though the envelope timestamp moves on.
+    """
+    data = dumps(payload)
+    etag = hashlib.blake2b(data, digest_size=12).hexdigest()
+    body = b'{"success":true,"data":' + data + b',"timestamp":' + dumps(timestamp) + b'}'
+    return EncodedJSON(body, etag)
+
+
+def preferred_encoding(accept_encoding):
+    """Pick br or gzip from an Accept-Encoding header, skipping codings the client refused with q=0"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def json_response(app, request, encoded):
+    """Build a response for an EncodedJSON, answering 304 on a matching If-None-Match"""
+    if request.if_none_match.contains_weak(encoded.etag):
+        response = app.response_class(status=304)
+    else:
+        body = encoded.body
+        encoding = None
+        if len(body) >= COMPRESS_MIN_BYTES:
+            encoding = preferred_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is not None:
+            body = encoded.compressed(encoding)
+        response = app.response_class(body, mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+
+    # Weak, because gzip and identity bodies share the tag
+    response.set_etag(encoded.etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
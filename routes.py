@@ -1,9 +1,336 @@
-from flask import render_template, jsonify, request
+from flask import render_template, jsonify, request, Response
 from app import app
 from data_service import DataService
+from snapshot_cache import SnapshotCache
+from live_stream import LiveStream
+from snapshot_delta import VersionedSnapshots
+from timeseries_store import TimeSeriesStore, HistoryRecorder
+from site_registry import UnknownSiteError
+from fleet_summary import FleetSummary
+from connectors import MockConnector, HTTPConnector, SourceHub, SECTION_PATHS
+from alert_engine import AlertEngine, AlertMonitor, site_rules
+from shared_state import SharedStateStore, LeaderLease
+from work_order_store import WorkOrderStore
+from export import EXPORT_FORMATS, check_format, export_chunks
+from responses import encode_envelope as encode_json_envelope, json_response
+import metrics
+import os
+from datetime import datetime
 import logging
 
-data_service = DataService()
+history_store = TimeSeriesStore(os.environ.get('HISTORY_DB_PATH', 'factory_history.db'))
+data_service = DataService(history_store)
+
+# Multi-worker deployments (gunicorn.conf.py) share snapshots, versions and leases through this store
+shared_state = SharedStateStore(os.environ['SHARED_STATE_PATH']) if os.environ.get('SHARED_STATE_PATH') else None
+# Sections regenerated once per tick by whichever worker holds their lease
+SHARED_DOMAINS = ('sensor_data', 'mes_data', 'erp_data', 'work_orders', 'production_metrics', 'historical_data')
+# One worker records history and evaluates alerts for the whole deployment
+background_lease = LeaderLease(shared_state, 'background') if shared_state is not None else None
+
+
+def build_connectors():
+    """Map each live section to its connector; the mock generator serves anything not configured"""
+    timeout = float(os.environ.get('SOURCE_TIMEOUT', '2.0'))
+    mock = MockConnector(data_service, timeout)
+    connectors = {domain: mock for domain in SECTION_PATHS}
+    fleet_profiles = data_service.registry.fleet_profiles()
+    if fleet_profiles:
+        # Simulated load-test sites (FLEET_SITES) come from one vectorized tick shared by the whole fleet
+        from fleet_generator import FleetConnector, FleetGenerator
+
+        generator = FleetGenerator(fleet_profiles, int(os.environ.get('FLEET_SEED', '2024')))
+        fleet = FleetConnector(generator, mock, SnapshotCache.DEFAULT_TTLS['sensor_data'], timeout)
+        for domain in FleetConnector.DOMAINS:
+            connectors[domain] = fleet
+        logging.info(f"Using fleet connector for {len(fleet_profiles)} simulated sites")
+    remote_sources = (
+        ('historian', 'HISTORIAN_API_URL', ('sensor_data',)),
+        ('mes', 'MES_API_URL', ('mes_data', 'work_orders', 'production_metrics')),
+        ('erp', 'ERP_API_URL', ('erp_data',))
+    )
+    for name, env_var, domains in remote_sources:
+        url = os.environ.get(env_var)
+        if url:
+            connector = HTTPConnector(name, url, {domain: SECTION_PATHS[domain] for domain in domains}, timeout=timeout)
+            for domain in domains:
+                connectors[domain] = connector
+            logging.info(f"Using {name} connector at {url} for {', '.join(domains)}")
+    return connectors
+
+
+# With shared state the cache's lease decides when a section is fetched, so nothing refreshes ahead of time
+source_hub = SourceHub(
+    build_connectors(), refresh_intervals=SnapshotCache.DEFAULT_TTLS, background=shared_state is None
+)
+
+
+def build_section(name, site, time_range='24h'):
+    """Build a dashboard section: live sections from the source hub, history from the store"""
+    if name == 'historical_data':
+        return data_service.get_historical_data(time_range, site)
+    return source_hub.get(name, site)
+
+
+def encode_envelope(payload):
+    """Serialize a payload into the standard success envelope once, for reuse across requests"""
+    return encode_json_envelope(payload, data_service.get_current_timestamp())
+
+
+snapshot_cache = SnapshotCache(encode=encode_envelope, shared=shared_state, shared_domains=SHARED_DOMAINS)
+
+
+def load_section(name, site):
+    """Get a live section through the snapshot cache"""
+    return snapshot_cache.get_payload(name, site, (), lambda: build_section(name, site))
+
+
+history_recorder = HistoryRecorder(
+    history_store, lambda site: data_service.sample_history(site, load_section), list(data_service.sites),
+    interval=float(os.environ.get('HISTORY_SAMPLE_INTERVAL', '10.0')),
+    is_leader=background_lease.is_leader if background_lease is not None else None
+)
+
+# Upper bound on the history point budget a client may ask for
+MAX_HISTORY_POINTS = 10000
+# Latest accepted timestamp argument (9999-12-31T23:59:59Z)
+MAX_TIMESTAMP = 253402300799
+
+
+def requested_site():
+    """Get the site named in the request; unknown sites are answered with a 404"""
+    site = request.args.get('site', 'germany')
+    data_service.registry.get(site)
+    return site
+
+
+def requested_time(name):
+    """Get an optional epoch-seconds or ISO 8601 timestamp argument; malformed values raise ValueError"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        timestamp = float(value)
+    except ValueError:
+        try:
+            timestamp = datetime.fromisoformat(value).timestamp()
+        except (ValueError, OverflowError, OSError):
+            raise ValueError(f"Invalid {name} timestamp: {value}")
+    # Also rejects inf and nan, which int() cannot convert
+    if not 0 <= timestamp <= MAX_TIMESTAMP:
+        raise ValueError(f"{name} must be an epoch time between 0 and {MAX_TIMESTAMP}")
+    return int(timestamp)
+
+
+def requested_max_points():
+    """Get the optional chart point budget"""
+    max_points = request.args.get('max_points', type=int)
+    if max_points is not None and not 3 <= max_points <= MAX_HISTORY_POINTS:
+        raise ValueError(f"max_points must be between 3 and {MAX_HISTORY_POINTS}")
+    return max_points
+
+
+def requested_limit():
+    """Get the page size argument; non-integer values raise ValueError"""
+    value = request.args.get('limit') or '50'
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid limit: {value}")
+
+
+def requested_since():
+    """Get the optional snapshot version a client already has; non-integer values raise ValueError"""
+    value = request.args.get('since')
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid since version: {value}")
+
+
+def requested_list(name):
+    """Get an optional comma-separated list argument"""
+    return tuple(value.strip() for value in request.args.get(name, '').split(',') if value.strip())
+
+
+def requested_date(name):
+    """Get an optional YYYY-MM-DD date argument; malformed values raise ValueError"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid {name} date: {value}")
+    return value
+
+
+def cached_response(domain, site, params, build):
+    """Serve a snapshot from the cache, skipping jsonify on hits and answering 304 when unchanged"""
+    encoded = snapshot_cache.get_body(domain, site, params, build)
+    return json_response(app, request, encoded)
+
+
+def dashboard_snapshot_builder(site, fields, time_range):
+    """Get a builder composing the dashboard snapshot from per-section cache entries"""
+    def build_snapshot():
+        # Each section keeps its own TTL inside the composed snapshot
+        return {
+            name: snapshot_cache.get_payload(
+                name, site, (time_range,) if name == 'historical_data' else (),
+                lambda name=name: build_section(name, site, time_range)
+            )
+            for name in fields
+        }
+    
+    return build_snapshot
+
+
+def dashboard_body(site, fields, time_range='24h'):
+    """Get the serialized dashboard snapshot"""
+    return snapshot_cache.get_body(
+        'dashboard', site, (fields, time_range), dashboard_snapshot_builder(site, fields, time_range)
+    )
+
+
+def dashboard_payload(site, fields, time_range='24h'):
+    """Get the dashboard snapshot as a dict"""
+    return snapshot_cache.get_payload(
+        'dashboard', site, (fields, time_range), dashboard_snapshot_builder(site, fields, time_range)
+    )
+
+
+# Live updates carry every section except history, which clients load per time range,
+# and work orders, which they page through /api/work-orders
+STREAM_FIELDS = tuple(
+    name for name in DataService.SNAPSHOT_SECTIONS if name not in ('historical_data', 'work_orders')
+)
+
+snapshot_versions = VersionedSnapshots(build=lambda site: dashboard_payload(site, STREAM_FIELDS), shared=shared_state)
+
+
+def changes_body(site, since=None):
+    """Get the serialized changes for a site since a client's version (full resync when unknown)"""
+    version, _ = snapshot_versions.current(site)
+    return version, snapshot_cache.get_body(
+        'dashboard_changes', site, (since, version),
+        lambda: snapshot_versions.changes(site, since, version)
+    )
+
+
+def build_stream_update(site):
+    """Build the stream frames for a site's latest version"""
+    version, full = changes_body(site)
+    delta = changes_body(site, version - 1)[1] if version > 1 else None
+    return version, full.body, delta.body if delta is not None else None
+
+
+live_stream = LiveStream(
+    build=build_stream_update,
+    interval=float(os.environ.get('STREAM_INTERVAL', '2.0')),
+    heartbeat=float(os.environ.get('STREAM_HEARTBEAT', '15.0'))
+)
+
+fleet_summary = FleetSummary(
+    load_section=load_section,
+    site_names=data_service.sites,
+    max_workers=int(os.environ.get('SUMMARY_WORKERS', '8')),
+    timeout=float(os.environ.get('SUMMARY_SITE_TIMEOUT', '2.0'))
+)
+# Indexed per-site copies of the work_orders section, refreshed whenever the section changes
+work_order_stores = {site: WorkOrderStore() for site in data_service.sites}
+
+alert_engine = AlertEngine(cooldown=float(os.environ.get('ALERT_COOLDOWN', '60.0')), silences=shared_state)
+for site_key, profile in data_service.registry.profiles.items():
+    alert_engine.add_site(site_key, site_rules(profile))
+
+
+def build_alerts_snapshot(engine):
+    """Get every site's active (including silenced) and recently cleared alerts plus engine counters"""
+    return {
+        'sites': {
+            site: {'active': engine.active(site, include_silenced=True), 'recent': engine.recent(site)}
+            for site in data_service.sites
+        },
+        'stats': engine.stats()
+    }
+
+
+def alerts_snapshot():
+    """Get the current alerts, as published by the evaluating worker when state is shared"""
+    if shared_state is not None:
+        row = shared_state.get('alerts')
+        if row is not None:
+            return row.payload()
+    return build_alerts_snapshot(alert_engine)
+
+
+alert_monitor = AlertMonitor(
+    alert_engine, load_section, list(data_service.sites),
+    interval=float(os.environ.get('ALERT_INTERVAL', '2.0')),
+    is_leader=background_lease.is_leader if background_lease is not None else None,
+    publish=(lambda engine: shared_state.put('alerts', build_alerts_snapshot(engine), 3600))
+    if shared_state is not None else None
+)
+
+
+def collect_runtime_metrics():
+    """Expose cache, source and stream state at scrape time"""
+    cache = snapshot_cache.stats()
+    sources = source_hub.status()
+    streams = live_stream.stats()
+    alerts = alerts_snapshot()['stats']
+    return [
+        ('factory_snapshot_cache_hits_total', 'counter', 'Snapshot cache hits', (), {(): cache['hits']}),
+        ('factory_snapshot_cache_misses_total', 'counter', 'Snapshot cache misses', (), {(): cache['misses']}),
+        ('factory_snapshot_cache_evictions_total', 'counter', 'Snapshot cache LRU evictions', (), {(): cache['evictions']}),
+        ('factory_snapshot_cache_hit_ratio', 'gauge', 'Snapshot cache hit ratio', (), {(): cache['hit_rate']}, 'mean'),
+        ('factory_snapshot_cache_entries', 'gauge', 'Snapshot cache entries', (), {(): cache['entries']}),
+        ('factory_source_circuit_open', 'gauge', 'Whether a data source circuit breaker is open', ('source',), {
+            (name,): int(source['circuit'] == 'open') for name, source in sources['sources'].items()
+        }, 'max'),
+        ('factory_stream_subscribers', 'gauge', 'Connected live stream clients', ('site',), {
+            (site,): stream['subscribers'] for site, stream in streams.items()
+        }),
+        ('factory_alerts_active', 'gauge', 'Active alerts', ('severity',), {
+            (severity,): count for severity, count in alerts['active'].items()
+        }, 'latest'),
+        # Alert stats come from the shared alerts snapshot, so every worker reports the same values
+        ('factory_alert_readings_total', 'counter', 'Readings evaluated by the alert engine', (), {
+            (): alerts['readings']
+        }, 'latest'),
+        ('factory_alerts_suppressed_total', 'counter', 'Alerts suppressed during cooldown', (), {
+            (): alerts['suppressed']
+        }, 'latest')
+    ]
+
+
+metrics.registry.add_collector(collect_runtime_metrics)
+shared_metrics = metrics.SharedMetrics(metrics.registry, shared_state) if shared_state is not None else None
+
+
+def start_background():
+    """Start this process's background threads; forking servers call it in each worker after the fork"""
+    source_hub.start()
+    history_recorder.start()
+    alert_monitor.start()
+    if shared_metrics is not None:
+        shared_metrics.start()
+
+
+# gunicorn.conf.py defers this to post_worker_init, since threads do not survive fork()
+if os.environ.get('DEFER_BACKGROUND_START') != '1':
+    start_background()
+
+@app.errorhandler(UnknownSiteError)
+def handle_unknown_site(e):
+    """Reject requests for sites that are not in the registry"""
+    return jsonify({
+        'success': False,
+        'error': str(e)
+    }), 404
 
 @app.route('/')
 def index():
@@ -13,14 +340,9 @@ def index():
 @app.route('/api/sensor-data')
 def get_sensor_data():
     """Get current sensor readings"""
+    site = requested_site()
     try:
-        site = request.args.get('site', 'germany')
-        sensor_data = data_service.get_sensor_data(site)
-        return jsonify({
-            'success': True,
-            'data': sensor_data,
-            'timestamp': data_service.get_current_timestamp()
-        })
+        return cached_response('sensor_data', site, (), lambda: source_hub.get('sensor_data', site))
     except Exception as e:
         logging.error(f"Error fetching sensor data: {str(e)}")
         return jsonify({
@@ -31,14 +353,9 @@ def get_sensor_data():
 @app.route('/api/mes-data')
 def get_mes_data():
     """Get Manufacturing Execution System data"""
+    site = requested_site()
     try:
-        site = request.args.get('site', 'germany')
-        mes_data = data_service.get_mes_data(site)
-        return jsonify({
-            'success': True,
-            'data': mes_data,
-            'timestamp': data_service.get_current_timestamp()
-        })
+        return cached_response('mes_data', site, (), lambda: source_hub.get('mes_data', site))
     except Exception as e:
         logging.error(f"Error fetching MES data: {str(e)}")
         return jsonify({
@@ -49,14 +366,9 @@ def get_mes_data():
 @app.route('/api/erp-data')
 def get_erp_data():
     """Get Enterprise Resource Planning data"""
+    site = requested_site()
     try:
-        site = request.args.get('site', 'germany')
-        erp_data = data_service.get_erp_data(site)
-        return jsonify({
-            'success': True,
-            'data': erp_data,
-            'timestamp': data_service.get_current_timestamp()
-        })
+        return cached_response('erp_data', site, (), lambda: source_hub.get('erp_data', site))
     except Exception as e:
         logging.error(f"Error fetching ERP data: {str(e)}")
         return jsonify({
@@ -66,15 +378,31 @@ def get_erp_data():
 
 @app.route('/api/work-orders')
 def get_work_orders():
-    """Get current work orders with progress"""
+    """Get a filtered, sorted page of work orders with counts by status"""
+    site = requested_site()
     try:
-        site = request.args.get('site', 'germany')
-        work_orders = data_service.get_work_orders(site)
+        order = request.args.get('order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        store = work_order_stores[site]
+        store.sync(load_section('work_orders', site))
+        page = store.query(
+            statuses=requested_list('status'),
+            priorities=requested_list('priority'),
+            line=request.args.get('line') or None,
+            due_after=requested_date('due_after'),
+            due_before=requested_date('due_before'),
+            sort=request.args.get('sort', 'due_date'),
+            descending=order == 'desc',
+            limit=requested_limit(),
+            cursor=request.args.get('cursor') or None
+        )
+        return json_response(app, request, encode_envelope(page))
+    except ValueError as e:
         return jsonify({
-            'success': True,
-            'data': work_orders,
-            'timestamp': data_service.get_current_timestamp()
-        })
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error fetching work orders: {str(e)}")
         return jsonify({
@@ -85,14 +413,9 @@ def get_work_orders():
 @app.route('/api/production-metrics')
 def get_production_metrics():
     """Get production performance metrics"""
+    site = requested_site()
     try:
-        site = request.args.get('site', 'germany')
-        metrics = data_service.get_production_metrics(site)
-        return jsonify({
-            'success': True,
-            'data': metrics,
-            'timestamp': data_service.get_current_timestamp()
-        })
+        return cached_response('production_metrics', site, (), lambda: source_hub.get('production_metrics', site))
     except Exception as e:
         logging.error(f"Error fetching production metrics: {str(e)}")
         return jsonify({
@@ -103,15 +426,23 @@ def get_production_metrics():
 @app.route('/api/historical-data')
 def get_historical_data():
     """Get historical data for charts"""
+    site = requested_site()
     try:
         time_range = request.args.get('range', '24h')  # Default to 24 hours
-        site = request.args.get('site', 'germany')
-        historical_data = data_service.get_historical_data(time_range, site)
+        max_points = requested_max_points()
+        # Snapped to the tier's bucket width, so arbitrary timestamps cannot each claim a cache entry
+        start, end = data_service.snap_history_window(time_range, requested_time('start'), requested_time('end'))
+        if max_points is None and start is None and end is None:
+            return cached_response('historical_data', site, (time_range,), lambda: data_service.get_historical_data(time_range, site))
+        return cached_response(
+            'historical_data', site, (time_range, max_points, start, end),
+            lambda: data_service.get_historical_data(time_range, site, max_points, start, end)
+        )
+    except ValueError as e:
         return jsonify({
-            'success': True,
-            'data': historical_data,
-            'timestamp': data_service.get_current_timestamp()
-        })
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error fetching historical data: {str(e)}")
         return jsonify({
@@ -119,19 +450,200 @@ def get_historical_data():
             'error': 'Failed to fetch historical data'
         }), 500
 
+@app.route('/api/export')
+def export_history():
+    """Stream a site's recorded history as CSV, NDJSON or Parquet without buffering it"""
+    site = requested_site()
+    try:
+        export_format = request.args.get('format', 'csv')
+        check_format(export_format)
+        mimetype, extension, batch_size = EXPORT_FORMATS[export_format]
+        resolution, start, end, batches = data_service.export_history(
+            site,
+            metrics=requested_list('metrics'),
+            time_range=request.args.get('range', '30d'),
+            start=requested_time('start'),
+            end=requested_time('end'),
+            resolution=request.args.get('resolution') or None,
+            batch_size=batch_size
+        )
+        # No Content-Length: the body goes out with chunked transfer encoding as rows are read
+        return Response(
+            export_chunks(export_format, batches),
+            mimetype=mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename="{site}-history-{resolution}-{start}-{end}.{extension}"',
+                'Cache-Control': 'no-store',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logging.error(f"Error starting history export: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to export history'
+        }), 500
+
+@app.route('/api/dashboard')
+def get_dashboard():
+    """Get an aggregated snapshot of all dashboard sections for a site"""
+    site = requested_site()
+    try:
+        time_range = request.args.get('range', '24h')
+        fields = data_service.resolve_snapshot_fields(
+            [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        )
+        return json_response(app, request, dashboard_body(site, fields, time_range))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logging.error(f"Error fetching dashboard snapshot: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch dashboard snapshot'
+        }), 500
+
+@app.route('/api/dashboard/changes')
+def get_dashboard_changes():
+    """Get a JSON-patch of live dashboard sections since a client's version, or a full resync"""
+    site = requested_site()
+    try:
+        _, encoded = changes_body(site, requested_since())
+        return json_response(app, request, encoded)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logging.error(f"Error fetching dashboard changes: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch dashboard changes'
+        }), 500
+
 @app.route('/api/sites')
 def get_sites():
     """Get available sites"""
     try:
-        sites = data_service.get_site_list()
+        return cached_response('sites', None, (), data_service.get_site_list)
+    except Exception as e:
+        logging.error(f"Error fetching sites: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch sites'
+        }), 500
+
+@app.route('/api/sites/summary')
+def get_sites_summary():
+    """Get OEE, production and downtime for every site plus fleet-wide aggregates"""
+    sites = tuple(sorted(s.strip() for s in request.args.get('sites', '').split(',') if s.strip()))
+    for site in sites:
+        data_service.registry.get(site)
+    try:
+        return cached_response('sites_summary', None, sites, lambda: fleet_summary.summarize(sites))
+    except Exception as e:
+        logging.error(f"Error fetching sites summary: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch sites summary'
+        }), 500
+
+@app.route('/api/sources')
+def get_sources():
+    """Get connector circuit states and section staleness"""
+    return jsonify({
+        'success': True,
+        'data': source_hub.status(),
+        'timestamp': data_service.get_current_timestamp()
+    })
+
+@app.route('/api/alerts')
+def get_alerts():
+    """Get active and recently cleared alerts for a site"""
+    site = requested_site()
+    try:
+        include_silenced = request.args.get('include_silenced') == '1'
+        snapshot = alerts_snapshot()
+        alerts = snapshot['sites'].get(site, {'active': [], 'recent': []})
+        # Silences are applied on read so they take effect before the next publish
+        silenced = alert_engine.silenced()
+        active = [dict(alert, silenced=alert['id'] in silenced) for alert in alerts['active']]
         return jsonify({
             'success': True,
-            'data': sites,
+            'data': {
+                'active': active if include_silenced else [alert for alert in active if not alert['silenced']],
+                'recent': alerts['recent'],
+                'stats': dict(snapshot['stats'], silenced=len(silenced))
+            },
             'timestamp': data_service.get_current_timestamp()
         })
     except Exception as e:
-        logging.error(f"Error fetching sites: {str(e)}")
+        logging.error(f"Error fetching alerts: {str(e)}")
         return jsonify({
             'success': False,
-            'error': 'Failed to fetch sites'
+            'error': 'Failed to fetch alerts'
         }), 500
+
+@app.route('/api/alerts/<alert_id>/silence', methods=['POST'])
+def silence_alert(alert_id):
+    """Silence an alert for a number of minutes (default 30)"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        body = {}
+    if 'minutes' in body:
+        minutes = body['minutes']
+    else:
+        try:
+            minutes = float(request.args.get('minutes', 30))
+        except ValueError:
+            minutes = None
+    # bool is an int subclass, so JSON true would otherwise pass as 1 minute; nan fails the range check
+    if isinstance(minutes, bool) or not isinstance(minutes, (int, float)) or not 0 < minutes <= 24 * 60:
+        return jsonify({
+            'success': False,
+            'error': 'minutes must be between 0 and 1440'
+        }), 400
+    alert_engine.silence(alert_id, minutes * 60)
+    return jsonify({
+        'success': True,
+        'data': {'id': alert_id, 'silenced_minutes': minutes},
+        'timestamp': data_service.get_current_timestamp()
+    })
+
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """Get snapshot cache hit/miss counters"""
+    return jsonify({
+        'success': True,
+        'data': snapshot_cache.stats(),
+        'timestamp': data_service.get_current_timestamp()
+    })
+
+@app.route('/api/stream')
+def get_stream():
+    """Stream live dashboard snapshots for a site as Server-Sent Events"""
+    site = requested_site()
+    last_event_id = request.headers.get('Last-Event-ID')
+    return Response(
+        live_stream.events(site, last_event_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/metrics')
+def get_metrics():
+    """Expose metrics in Prometheus text exposition format"""
+    body = shared_metrics.render() if shared_metrics is not None else metrics.registry.render()
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,230 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+from responses import dumps, loads
+
+
+class SharedRow:
+    """A section published to the shared store"""
+
+    __slots__ = ('version', 'expires_at', 'data')
+
+    def __init__(self, version, expires_at, data):
+        self.version = version
+        self.expires_at = expires_at
+        self.data = data
+
+    def payload(self):
+        return loads(self.data)
+
+
+class SharedStateStore:
+    """Cross-process snapshot store for gunicorn workers, backed by SQLite in WAL mode
+
+    Holds the latest serialized payload of every shared section, per-site dashboard
+    snapshot versions, alert silences, each worker's metrics, and leases that let exactly one worker
+    regenerate a stale section (or run a background job) while the rest read.
+    """
+
+    # worker_metrics row holding the totals of workers that have exited
+    RETIRED = 'retired'
+
+    def __init__(self, path, lease_ttl=30.0, max_versions=32):
+        self.path = path
+        self.lease_ttl = lease_ttl
+        self.max_versions = max_versions
+        self._local = threading.local()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+        self._create_schema()
+        logging.info(f"SharedStateStore initialized at {path}")
+
+    def _reset_after_fork(self):
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit; multi-statement updates open their own BEGIN IMMEDIATE transaction
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS sections ('
+            'key TEXT PRIMARY KEY, version INTEGER NOT NULL, expires_at REAL NOT NULL, data BLOB NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS snapshot_versions ('
+            'site TEXT NOT NULL, version INTEGER NOT NULL, digest TEXT NOT NULL, data BLOB NOT NULL, '
+            'PRIMARY KEY (site, version)) WITHOUT ROWID'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        connection.execute('CREATE TABLE IF NOT EXISTS silences (alert_id TEXT PRIMARY KEY, until REAL NOT NULL)')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS worker_metrics (worker TEXT PRIMARY KEY, updated_at REAL NOT NULL, data BLOB NOT NULL)'
+        )
+
+    @staticmethod
+    def owner():
+        # Leases belong to a worker process; threads within it coordinate through their own locks
+        return str(os.getpid())
+
+    def get(self, key):
+        """Get the published row for a key, or None"""
+        row = self._connection().execute(
+            'SELECT version, expires_at, data FROM sections WHERE key = ?', (key,)
+        ).fetchone()
+        return SharedRow(*row) if row is not None else None
+
+    def put(self, key, payload, ttl):
+        """Publish a payload for a key and return its new version"""
+        data = dumps(payload)
+        # One statement, so allocating the version and writing the row happen under one write lock
+        return self._connection().execute(
+            'INSERT INTO sections (key, version, expires_at, data) '
+            'VALUES (?, (SELECT COALESCE(MAX(version), 0) + 1 FROM sections), ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET version = excluded.version, '
+            'expires_at = excluded.expires_at, data = excluded.data '
+            'RETURNING version',
+            (key, time.time() + ttl, data)
+        ).fetchone()[0]
+
+    def acquire(self, name, ttl=None):
+        """Take or renew a named lease; False while another live process holds it"""
+        now = time.time()
+        owner = self.owner()
+        cursor = self._connection().execute(
+            'INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+            'WHERE leases.expires_at <= ? OR leases.owner = ?',
+            (name, owner, now + (ttl if ttl is not None else self.lease_ttl), now, owner)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, name):
+        self._connection().execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, self.owner()))
+
+    def record_version(self, site, snapshot):
+        """Get the shared version number for a site's snapshot, allocating the next one if it changed
+
+        Workers composing identical content agree on its version, so any worker
+        can answer a client's `since` from another worker.
+        """
+        data = dumps(snapshot)
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            latest = connection.execute(
+                'SELECT version, digest FROM snapshot_versions WHERE site = ? ORDER BY version DESC LIMIT 1', (site,)
+            ).fetchone()
+            if latest is not None and latest[1] == digest:
+                version = latest[0]
+            else:
+                version = latest[0] + 1 if latest is not None else 1
+                connection.execute('INSERT INTO snapshot_versions VALUES (?, ?, ?, ?)', (site, version, digest, data))
+                connection.execute(
+                    'DELETE FROM snapshot_versions WHERE site = ? AND version <= ?', (site, version - self.max_versions)
+                )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return version
+
+    def load_version(self, site, version):
+        """Get a recorded snapshot by version, or None once it has aged out"""
+        row = self._connection().execute(
+            'SELECT data FROM snapshot_versions WHERE site = ? AND version = ?', (site, version)
+        ).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    def silence(self, alert_id, until):
+        connection = self._connection()
+        connection.execute('DELETE FROM silences WHERE until <= ?', (time.time(),))
+        connection.execute(
+            'INSERT INTO silences VALUES (?, ?) ON CONFLICT (alert_id) DO UPDATE SET until = excluded.until',
+            (alert_id, until)
+        )
+
+    def silences(self, now=None):
+        """Get alert id -> silenced-until for silences still in effect"""
+        now = now if now is not None else time.time()
+        return dict(self._connection().execute('SELECT alert_id, until FROM silences WHERE until > ?', (now,)).fetchall())
+
+    def put_worker_metrics(self, worker, families):
+        self._connection().execute(
+            'INSERT INTO worker_metrics VALUES (?, ?, ?) '
+            'ON CONFLICT (worker) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data',
+            (worker, time.time(), dumps(families))
+        )
+
+    def worker_metrics(self):
+        """Get (worker, updated_at, families) for every worker that has published metrics"""
+        rows = self._connection().execute(
+            'SELECT worker, updated_at, data FROM worker_metrics WHERE worker != ?', (self.RETIRED,)
+        ).fetchall()
+        return [(worker, updated_at, loads(data)) for worker, updated_at, data in rows]
+
+    def retired_metrics(self):
+        """Get the metrics folded in from exited workers, or None"""
+        row = self._connection().execute('SELECT data FROM worker_metrics WHERE worker = ?', (self.RETIRED,)).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    def retire_worker_metrics(self, worker, fold):
+        """Replace the retired metrics with fold(retired, worker's families) and drop the worker's row
+
+        Runs as one transaction, so two workers retiring the same row cannot count it twice.
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT data FROM worker_metrics WHERE worker = ?', (worker,)).fetchone()
+            if row is not None:
+                retired = connection.execute(
+                    'SELECT data FROM worker_metrics WHERE worker = ?', (self.RETIRED,)
+                ).fetchone()
+                folded = fold(loads(retired[0]) if retired is not None else [], loads(row[0]))
+                connection.execute(
+                    'INSERT INTO worker_metrics VALUES (?, ?, ?) '
+                    'ON CONFLICT (worker) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data',
+                    (self.RETIRED, time.time(), dumps(folded))
+                )
+                connection.execute('DELETE FROM worker_metrics WHERE worker = ?', (worker,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+
+class LeaderLease:
+    """Elects one worker process to run a background job, failing over when its lease lapses"""
+
+    def __init__(self, store, name, ttl=30.0):
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+        self._renewed_at = 0.0
+        self._leader = False
+
+    def is_leader(self):
+        now = time.monotonic()
+        # Renew well before expiry; losing the lease needs ttl seconds of silence from the holder
+        if now - self._renewed_at >= self.ttl / 3:
+            try:
+                self._leader = self.store.acquire(self.name, self.ttl)
+            except sqlite3.Error as e:
+                logging.error(f"Error renewing {self.name} lease: {str(e)}")
+                self._leader = False
+            self._renewed_at = now
+        return self._leader
@@ -0,0 +1,255 @@
+import copy
+import json
+import os
+import logging
+
+
+class UnknownSiteError(LookupError):
+    """Raised when a request names a site that is not in the registry"""
+
+    def __init__(self, site):
+        super().__init__(f"Unknown site: {site}")
+        self.site = site
+
+
+class FleetConfig:
+    """Size and seed of a simulated load-test fleet added on top of the configured sites"""
+
+    __slots__ = ('sites', 'lines_per_site', 'sensors_per_site', 'work_orders_per_site', 'seed')
+
+    def __init__(self, sites=50, lines_per_site=200, sensors_per_site=2000, work_orders_per_site=500, seed=2024):
+        self.sites = sites
+        self.lines_per_site = lines_per_site
+        self.sensors_per_site = sensors_per_site
+        self.work_orders_per_site = work_orders_per_site
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls):
+        """Get the fleet requested through FLEET_SITES (and FLEET_LINES, FLEET_SENSORS, ...), or None"""
+        sites = int(os.environ.get('FLEET_SITES', '0'))
+        if sites <= 0:
+            return None
+        return cls(
+            sites,
+            int(os.environ.get('FLEET_LINES', '200')),
+            int(os.environ.get('FLEET_SENSORS', '2000')),
+            int(os.environ.get('FLEET_WORK_ORDERS', '500')),
+            int(os.environ.get('FLEET_SEED', '2024'))
+        )
+
+
+def fleet_site_configs(configs, fleet):
+    """Derive simulated fleet site configs from the configured sites, cycling through them
+
+    Each fleet site keeps its base site's ranges, targets and products, with its
+    production lines repeated from the base line definitions up to the fleet size.
+    """
+    bases = list(configs.items())
+    fleet_configs = {}
+    for n in range(1, fleet.sites + 1):
+        base_key, base = bases[(n - 1) % len(bases)]
+        config = copy.deepcopy(base)
+        config['name'] = f"{base['name']} {n:03d}"
+        config['location_prefix'] = f'F{n:03d}-'
+        templates = base['mes']['production_lines']
+        config['mes']['production_lines'] = [
+            dict(templates[i % len(templates)], id=f'LINE_{i + 1:03d}', name=f'Line {i + 1}')
+            for i in range(fleet.lines_per_site)
+        ]
+        config['work_orders'].update(count=fleet.work_orders_per_site, lines=fleet.lines_per_site)
+        config['fleet'] = {'base': base_key, 'sensors': fleet.sensors_per_site}
+        fleet_configs[f'fleet-{n:03d}'] = config
+    return fleet_configs
+
+
+class LineProfile:
+    """Precomputed definition of one production line"""
+
+    __slots__ = ('id', 'name', 'statuses', 'efficiency_range', 'output_range', 'target_rate', 'efficiency_target')
+
+    def __init__(self, location_prefix, config):
+        self.id = f"{location_prefix}{config['id']}"
+        self.name = f"{location_prefix}{config['name']}"
+        self.statuses = tuple(config['statuses'])
+        self.efficiency_range = tuple(config['efficiency'])
+        self.output_range = tuple(config['output_rate'])
+        self.target_rate = config['target_rate']
+        low, high = self.efficiency_range
+        self.efficiency_target = config.get('efficiency_target', round(low + (high - low) * 0.15, 1))
+
+
+class SiteProfile:
+    """All site-specific ranges, targets and multipliers, precomputed once at startup"""
+
+    __slots__ = (
+        'key', 'summary', 'currency', 'location_prefix',
+        'temp_range', 'pressure_range', 'humidity_range', 'vibration_range',
+        'sensor_locations', 'alert_thresholds', 'oee_target',
+        'oee_range', 'quality_range', 'first_pass_yield_range', 'defect_rate_range', 'rework_rate_range',
+        'production_lines',
+        'inventory_ranges', 'inventory_minimums', 'finished_goods_ranges',
+        'revenue_range', 'cost_range', 'savings_range', 'target_revenue',
+        'supplier_performance_range', 'delivery_delays_range', 'pending_orders_range',
+        'products', 'work_order_count', 'quantity_range', 'work_order_ids', 'work_order_lines',
+        'target_base', 'actual_range', 'production_efficiency_range',
+        'weekday_range', 'saturday_range', 'sunday_range',
+        'downtime_total_range', 'downtime_unplanned_range',
+        'history_temp_range', 'history_pressure_range', 'history_production_range',
+        'fleet_sensors'
+    )
+
+    def __init__(self, key, config):
+        prefix = config['location_prefix']
+        self.key = key
+        self.summary = {
+            'name': config['name'],
+            'timezone': config['timezone'],
+            'currency': config['currency'],
+            'location_prefix': prefix
+        }
+        self.currency = config['currency']
+        self.location_prefix = prefix
+
+        sensors = config['sensors']
+        self.temp_range = tuple(sensors['temperature'])
+        self.pressure_range = tuple(sensors['pressure'])
+        self.humidity_range = tuple(sensors['humidity'])
+        self.vibration_range = tuple(sensors['vibration'])
+        self.sensor_locations = {
+            'temperature': f'{prefix}Production Floor A',
+            'pressure': f'{prefix}Hydraulic System',
+            'humidity': f'{prefix}Climate Control',
+            'vibration': f'{prefix}Motor Assembly'
+        }
+        # metric -> (warning, critical, hysteresis, max rate per second); levels default to near the
+        # top of each sensor range and the rate to a quarter of the range per second
+        alerts = config.get('alerts', {})
+        self.alert_thresholds = {}
+        for metric, (low, high) in sensors.items():
+            span = high - low
+            override = alerts.get(metric, {})
+            self.alert_thresholds[metric] = (
+                override.get('warning', round(high - span * 0.1, 2)),
+                override.get('critical', round(high - span * 0.03, 2)),
+                override.get('hysteresis', round(span * 0.05, 2)),
+                override.get('max_rate', round(span / 4, 2))
+            )
+
+        mes = config['mes']
+        oee_base, quality_base = mes['oee_base'], mes['quality_base']
+        self.oee_range = (oee_base - 10, oee_base + 10)
+        self.oee_target = alerts.get('oee_target', oee_base - 5)
+        self.quality_range = (quality_base - 5, quality_base + 2.5)
+        self.first_pass_yield_range = (quality_base - 2, quality_base + 2.8)
+        self.defect_rate_range = (0.1, mes['defect_rate_max'])
+        self.rework_rate_range = (0.5, mes['rework_rate_max'])
+        self.production_lines = tuple(LineProfile(prefix, line) for line in mes['production_lines'])
+
+        erp = config['erp']
+        inventory = erp['inventory_multiplier']
+        revenue = erp['revenue_multiplier']
+        cost = erp['cost_multiplier']
+        self.inventory_ranges = {
+            'steel_sheets': (int(150 * inventory), int(500 * inventory)),
+            'aluminum_bars': (int(50 * inventory), int(200 * inventory)),
+            'electronic_components': (int(800 * inventory), int(2000 * inventory))
+        }
+        self.inventory_minimums = {
+            'steel_sheets': int(200 * inventory),
+            'aluminum_bars': int(100 * inventory),
+            'electronic_components': int(1000 * inventory)
+        }
+        self.finished_goods_ranges = {
+            'product_a': (int(50 * inventory), int(200 * inventory)),
+            'product_b': (int(30 * inventory), int(150 * inventory)),
+            'product_c': (int(25 * inventory), int(100 * inventory))
+        }
+        self.revenue_range = (45000 * revenue, 85000 * revenue)
+        self.cost_range = (25000 * cost, 45000 * cost)
+        self.savings_range = (2000 * revenue, 8000 * revenue)
+        self.target_revenue = int(75000 * revenue)
+        self.supplier_performance_range = (erp['supplier_performance_min'], 98.0)
+        self.delivery_delays_range = (0, erp['delivery_delays_max'])
+        self.pending_orders_range = tuple(erp['pending_orders'])
+
+        work_orders = config['work_orders']
+        self.products = tuple(work_orders['products'])
+        self.work_order_count = work_orders['count']
+        self.quantity_range = tuple(work_orders['quantity'])
+        self.work_order_ids = tuple(f'{prefix}WO{2024000 + i + 1}' for i in range(self.work_order_count))
+        self.work_order_lines = tuple(f'{prefix}Line {i}' for i in range(1, work_orders.get('lines', 3) + 1))
+
+        production = config['production']
+        target = production['target_base']
+        variance = production['variance']
+        self.target_base = target
+        self.actual_range = (int(target * (1 - variance)), int(target * (1 + variance)))
+        self.production_efficiency_range = (production['efficiency_min'], 105.0)
+        self.weekday_range = (int(target * 0.85), int(target * 1.1))
+        self.saturday_range = (int(target * 0.6), int(target * 0.8))
+        self.sunday_range = (int(target * 0.4), int(target * 0.6))
+        self.downtime_total_range = tuple(production['downtime_total'])
+        self.downtime_unplanned_range = tuple(production['downtime_unplanned'])
+
+        history = config['history']
+        self.history_temp_range = tuple(history['temperature'])
+        self.history_pressure_range = tuple(history['pressure'])
+        self.history_production_range = tuple(history['production_rate'])
+
+        # Sensors per site for simulated fleet sites (served by fleet_generator); None for configured sites
+        self.fleet_sensors = config.get('fleet', {}).get('sensors')
+
+    def sensor_status(self, metric, value):
+        """Classify a single sensor reading against its alert thresholds"""
+        warning, critical = self.alert_thresholds[metric][:2]
+        if value >= critical:
+            return 'critical'
+        if value >= warning:
+            return 'warning'
+        return 'normal'
+
+
+class SiteRegistry:
+    """Site profiles loaded once from a JSON config file"""
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sites.json')
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.summaries = {key: profile.summary for key, profile in profiles.items()}
+
+    @classmethod
+    def load(cls, path=None, fleet=None):
+        """Load and precompute every site profile from a config file
+
+        A fleet (by default the one set through FLEET_SITES) adds simulated sites
+        derived from the configured ones.
+        """
+        path = path or os.environ.get('SITES_CONFIG', cls.DEFAULT_PATH)
+        fleet = fleet or FleetConfig.from_env()
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        sites = config['sites']
+        if fleet is not None:
+            sites = dict(sites, **fleet_site_configs(sites, fleet))
+        profiles = {key: SiteProfile(key, site) for key, site in sites.items()}
+        logging.info(f"SiteRegistry loaded {len(profiles)} sites from {path}")
+        return cls(profiles)
+
+    def fleet_profiles(self):
+        """Get the profiles of simulated fleet sites, in registry order"""
+        return [profile for profile in self.profiles.values() if profile.fleet_sensors is not None]
+
+    def get(self, site):
+        """Get a site's profile, raising UnknownSiteError for unknown sites"""
+        try:
+            return self.profiles[site]
+        except KeyError:
+            raise UnknownSiteError(site) from None
+
+    def __contains__(self, site):
+        return site in self.profiles
+
+    def __iter__(self):
+        return iter(self.profiles)
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+import logging
+
+
+class CacheEntry:
+    """A cached payload together with its pre-serialized response body"""
+
+    __slots__ = ('payload', 'body', 'expires_at', 'version')
+
+    def __init__(self, payload, body, expires_at, version=None):
+        self.payload = payload
+        self.body = body
+        self.expires_at = expires_at
+        self.version = version
+
+
+class SnapshotCache:
+    """Bounded LRU cache of dashboard snapshots with per-domain TTLs and single-flight refresh
+
+    With a `shared` store, domains in `shared_domains` are published to it so every
+    worker process serves the same payload and only the worker holding a key's
+    lease regenerates it; the others keep serving the previous copy meanwhile.
+    """
+
+    # Seconds each domain's snapshot stays fresh
+    DEFAULT_TTLS = {
+        'sensor_data': 2,
+        'mes_data': 10,
+        'erp_data': 60,
+        'work_orders': 30,
+        'production_metrics': 30,
+        'historical_data': 60,
+        'dashboard': 2,
+        'dashboard_changes': 60,
+        'sites': 3600,
+        'sites_summary': 5
+    }
+    DEFAULT_TTL = 5
+    # How soon to look again while another worker is regenerating a stale shared entry
+    SHARED_RETRY = 0.25
+
+    def __init__(self, encode, ttls=None, max_entries=256, shared=None, shared_domains=(), shared_wait=5.0):
+        self.encode = encode
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.shared = shared
+        self.shared_domains = frozenset(shared_domains)
+        self.shared_wait = shared_wait
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_builds = 0
+        self.shared_reads = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        logging.info(f"SnapshotCache initialized (max_entries={max_entries})")
+
+    def get_payload(self, domain, site, params, build):
+        """Return the cached payload for a key, rebuilding it once if stale"""
+        return self._load(domain, site, params, build).payload
+
+    def get_body(self, domain, site, params, build):
+        """Return the pre-serialized response body for a key, rebuilding it once if stale"""
+        return self._load(domain, site, params, build).body
+
+    def invalidate(self, domain=None, site=None):
+        """Drop cached entries, optionally limited to a domain and/or site"""
+        with self._lock:
+            for key in list(self._entries):
+                if (domain is None or key[0] == domain) and (site is None or key[1] == site):
+                    del self._entries[key]
+
+    def stats(self):
+        """Get hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'shared_builds': self.shared_builds,
+                'shared_reads': self.shared_reads
+            }
+
+    def _load(self, domain, site, params, build):
+        key = (domain, site, params)
+
+        with self._lock:
+            entry = self._fresh_entry(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+
+        # Only one thread rebuilds a given key; the rest wait and reuse its result
+        with key_lock:
+            with self._lock:
+                entry = self._fresh_entry(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+                self.misses += 1
+                stale = self._entries.get(key)
+
+            try:
+                ttl = self.ttls.get(domain, self.DEFAULT_TTL)
+                if self.shared is not None and domain in self.shared_domains:
+                    entry = self._load_shared(key, ttl, build, stale)
+                else:
+                    payload = build()
+                    entry = CacheEntry(payload, self.encode(payload), time.monotonic() + ttl)
+                with self._lock:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+                return entry
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def _load_shared(self, key, ttl, build, stale):
+        name = repr(key)
+        row = self.shared.get(name)
+        if row is None or row.expires_at <= time.time():
+            lease = f'section:{name}'
+            if self.shared.acquire(lease):
+                try:
+                    payload = build()
+                    version = self.shared.put(name, payload, ttl)
+                finally:
+                    self.shared.release(lease)
+                self.shared_builds += 1
+                return CacheEntry(payload, self.encode(payload), time.monotonic() + ttl, version)
+            if row is None:
+                row = self._wait_shared(name)
+                if row is None:
+                    # The lease holder is stuck; answer from a local build rather than fail
+                    logging.warning(f"Timed out waiting for shared {name}, building locally")
+                    payload = build()
+                    return CacheEntry(payload, self.encode(payload), time.monotonic() + ttl)
+
+        self.shared_reads += 1
+        # A stale row keeps being served until the lease holder publishes its replacement
+        expires_at = time.monotonic() + max(row.expires_at - time.time(), self.SHARED_RETRY)
+        if stale is not None and stale.version == row.version:
+            # Same object as before, so identity checks downstream see it as unchanged
+            return CacheEntry(stale.payload, stale.body, expires_at, row.version)
+        payload = row.payload()
+        return CacheEntry(payload, self.encode(payload), expires_at, row.version)
+
+    def _wait_shared(self, name):
+        deadline = time.monotonic() + self.shared_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            row = self.shared.get(name)
+            if row is not None:
+                return row
+        return None
+
+    def _fresh_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        return entry
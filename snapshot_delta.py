@@ -0,0 +1,99 @@
+import json
+import threading
+from collections import OrderedDict
+
+
+def escape_pointer(key):
+    """Escape a key for use as a JSON Pointer path segment"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def diff(old, new, path=''):
+    """Build a JSON-patch (RFC 6902) list of operations turning old into new"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            child = f'{path}/{escape_pointer(key)}'
+            if key in old:
+                ops.extend(diff(old[key], value, child))
+            else:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f'{path}/{escape_pointer(key)}'})
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (before, after) in enumerate(zip(old, new)):
+            ops.extend(diff(before, after, f'{path}/{index}'))
+        return ops
+
+    if old == new and type(old) is type(new):
+        return []
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+class SiteVersions:
+    """Ring buffer of recent snapshot versions for one site"""
+
+    def __init__(self, max_versions):
+        self.version = 0
+        self.snapshots = OrderedDict()
+        self.max_versions = max_versions
+        self.latest = None
+
+
+class VersionedSnapshots:
+    """Per-site snapshot versioning with delta encoding against a client's last version
+
+    With a `shared` store, version numbers and recent snapshots come from it, so
+    every worker process agrees on what a version means.
+    """
+
+    def __init__(self, build, max_versions=32, shared=None):
+        self.build = build
+        self.max_versions = max_versions
+        self.shared = shared
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def current(self, site):
+        """Get the latest (version, snapshot) for a site, recording a new version if it changed"""
+        snapshot = self.build(site)
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                state = self._sites[site] = SiteVersions(self.max_versions)
+
+            # The snapshot cache hands back the same object until it rebuilds
+            if snapshot is not state.latest:
+                if state.latest is None or snapshot != state.latest:
+                    if self.shared is not None:
+                        state.version = self.shared.record_version(site, snapshot)
+                    else:
+                        state.version += 1
+                    state.snapshots[state.version] = snapshot
+                    while len(state.snapshots) > state.max_versions:
+                        state.snapshots.popitem(last=False)
+                state.latest = snapshot
+            return state.version, state.snapshots[state.version]
+
+    def changes(self, site, since, version):
+        """Get a patch from version `since` to `version`, or a full resync if `since` is too old"""
+        with self._lock:
+            state = self._sites.get(site)
+            target = state.snapshots.get(version) if state else None
+            base = state.snapshots.get(since) if state and since is not None else None
+
+        if base is None and since is not None and self.shared is not None:
+            # The client may have been served by another worker
+            base = self.shared.load_version(site, since)
+        if target is None:
+            raise LookupError(f"Snapshot version {version} is no longer available")
+        if base is not None:
+            patch = diff(base, target)
+            # A patch touching nearly every field is larger than the snapshot itself
+            if len(json.dumps(patch)) < len(json.dumps(target)):
+                return {'version': version, 'base': since, 'full': False, 'patch': patch}
+        return {'version': version, 'full': True, 'snapshot': target}
@@ -0,0 +1,127 @@
+"""Long-running memory soak test for the dashboard page
+
+Opens the dashboard in headless Chromium against a running server (or a local
+gunicorn it starts), leaves it on live updates, and samples the JS heap after
+a forced GC together with DOM node and event listener counts. Results are
+written as JSON lines; the run fails if the heap or DOM keeps growing after
+the warm-up period:
+
+    pip install playwright && python -m playwright install chromium
+    python soak_test.py --hours 24 --output soak.jsonl
+    STREAM_INTERVAL=0.25 python soak_test.py --hours 1 --sample-minutes 1
+    python soak_test.py --url http://kiosk-host:5000/ --hours 24
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmark import free_port, wait_for_port
+
+SAMPLED_METRICS = ('JSHeapUsedSize', 'Nodes', 'JSEventListeners', 'Documents')
+
+
+def start_server():
+    """Start a local gunicorn with the production profile; its async workers hold the event stream open"""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+         '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'main:app'],
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    wait_for_port(port)
+    return server, f'http://127.0.0.1:{port}/'
+
+
+def slope_per_hour(samples, key):
+    """Least-squares growth rate of a sampled metric, in units per hour"""
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    xs = [s['elapsed_s'] / 3600 for s in samples]
+    ys = [s[key] for s in samples]
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+def sample(cdp, started):
+    # Collect first so the numbers reflect retained memory, not garbage awaiting collection
+    cdp.send('HeapProfiler.collectGarbage')
+    metrics = {m['name']: m['value'] for m in cdp.send('Performance.getMetrics')['metrics']}
+    result = {'elapsed_s': round(time.monotonic() - started, 1), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    result.update({name: metrics.get(name) for name in SAMPLED_METRICS})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak-test dashboard memory usage in a headless browser')
+    parser.add_argument('--url', help='Dashboard URL; a local gunicorn is started when omitted')
+    parser.add_argument('--hours', type=float, default=24.0)
+    parser.add_argument('--sample-minutes', type=float, default=5.0)
+    parser.add_argument('--warmup-minutes', type=float, default=30.0, help='Samples before this are not judged')
+    parser.add_argument('--max-heap-growth', type=float, default=1.0, help='Allowed JS heap growth in MB per hour')
+    parser.add_argument('--max-node-growth', type=float, default=50.0, help='Allowed DOM node growth per hour')
+    parser.add_argument('--output', help='Append samples to this JSON lines file')
+    args = parser.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        print('The soak test needs Playwright: pip install playwright && python -m playwright install chromium',
+              file=sys.stderr)
+        sys.exit(2)
+
+    server, url = (None, args.url) if args.url else start_server()
+    output = open(args.output, 'a') if args.output else None
+    samples = []
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            page = browser.new_page(viewport={'width': 1920, 'height': 1080})
+            page.on('pageerror', lambda error: print(f'Page error: {error}', file=sys.stderr))
+            page.goto(url)
+            cdp = page.context.new_cdp_session(page)
+            cdp.send('Performance.enable')
+
+            started = time.monotonic()
+            deadline = started + args.hours * 3600
+            while True:
+                result = sample(cdp, started)
+                samples.append(result)
+                line = json.dumps(result)
+                print(line, flush=True)
+                if output:
+                    output.write(line + '\n')
+                    output.flush()
+                if time.monotonic() >= deadline:
+                    break
+                page.wait_for_timeout(args.sample_minutes * 60 * 1000)
+            browser.close()
+    finally:
+        if output:
+            output.close()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    judged = [s for s in samples if s['elapsed_s'] >= args.warmup_minutes * 60]
+    heap_growth = slope_per_hour(judged, 'JSHeapUsedSize') / 1e6
+    node_growth = slope_per_hour(judged, 'Nodes')
+    print(f'JS heap growth after warm-up: {heap_growth:.3f} MB/h, DOM node growth: {node_growth:.1f}/h',
+          file=sys.stderr)
+    if len(judged) < 3:
+        print('Too few samples after warm-up to judge the trend', file=sys.stderr)
+        sys.exit(2)
+    if heap_growth > args.max_heap_growth or node_growth > args.max_node_growth:
+        print('Memory is still growing after warm-up', file=sys.stderr)
+        sys.exit(1)
+    print('Heap and DOM size are flat', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
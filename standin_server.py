@@ -0,0 +1,77 @@
+"""Local stand-in for the MES/ERP/historian gateways
+
+Serves the dashboard's per-section JSON routes from the mock generators with
+injected latency and failures, so HTTPConnector, the circuit breakers and
+serve-stale behaviour can be exercised without real backends:
+
+    python standin_server.py --port 5100 --latency 0.3 --jitter 0.2 --failure-rate 0.1
+    ERP_API_URL=http://127.0.0.1:5100 HISTORIAN_API_URL=http://127.0.0.1:5100 python main.py
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import logging
+
+from connectors import SECTION_PATHS
+from data_service import DataService
+from site_registry import UnknownSiteError
+
+
+def make_handler(data_service, latency, jitter, failure_rate):
+    routes = {path.split('?')[0]: domain for domain, path in SECTION_PATHS.items()}
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            domain = routes.get(url.path)
+            site = parse_qs(url.query).get('site', ['germany'])[0]
+
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+            if domain is None:
+                return self._send(404, {'success': False, 'error': 'Not found'})
+            if random.random() < failure_rate:
+                return self._send(503, {'success': False, 'error': 'Injected failure'})
+            try:
+                payload = data_service.build_section(domain, site)
+            except UnknownSiteError as e:
+                return self._send(404, {'success': False, 'error': str(e)})
+            self._send(200, {'success': True, 'data': payload, 'timestamp': data_service.get_current_timestamp()})
+
+        def _send(self, status, body):
+            encoded = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, format, *args):
+            logging.debug(f"stand-in: {format % args}")
+
+    return StandInHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a latency-injecting stand-in backend')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5100)
+    parser.add_argument('--latency', type=float, default=0.2, help='Base response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Random +/- delay in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    handler = make_handler(DataService(), args.latency, args.jitter, args.failure_rate)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    logging.info(f"Stand-in backend listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,23 @@ class FactoryDashboard {
     constructor() {
         this.charts = {};
         this.refreshInterval = null;
+        this.historyInterval = null;
+        this.alertsInterval = null;
+        this.workOrdersInterval = null;
+        this.workOrderPageSize = 10;
+        this.workOrderCursor = null; // cursor of the page shown; null for the first page
+        this.workOrderCursors = []; // cursors of earlier pages, for stepping back
+        this.workOrderNextCursor = null;
+        this.eventSource = null;
+        this.streamFailures = 0;
+        this.liveSnapshot = null;
+        this.snapshotVersion = null;
+        this.responseCache = new Map(); // endpoint -> {etag, data} for conditional requests
+        this.historyPoints = [];
+        this.historyWindow = null; // {start, end} epoch seconds while zoomed into the history chart
+        this.pendingRenders = new Map(); // section -> latest render callback, flushed once per frame
+        this.renderFrame = null;
+        this.oeeCenterValue = null;
         this.lastUpdateTime = null;
         this.isLoading = false;
         this.currentSite = 'germany'; // Default site
@@ -22,13 +39,18 @@ class FactoryDashboard {
         
         // Update current time
         this.updateCurrentTime();
-        setInterval(() => this.updateCurrentTime(), 1000);
+        setInterval(() => {
+            if (!document.hidden) {
+                this.updateCurrentTime();
+            }
+        }, 1000);
         
         // Initial data load
         this.loadAllData();
+        this.loadAlerts();
         
-        // Set up auto-refresh
-        this.setupAutoRefresh();
+        // Prefer pushed live updates, falling back to polling
+        this.setupLiveUpdates();
         
         // Hide loading overlay after initial load
         setTimeout(() => this.hideLoadingOverlay(), 2000);
@@ -49,15 +71,58 @@ class FactoryDashboard {
                 e.target.classList.add('active');
                 // Update current site
                 this.currentSite = e.target.getAttribute('data-site');
+                this.liveSnapshot = null;
+                this.snapshotVersion = null;
+                this.historyWindow = null;
+                this.resetWorkOrderPaging();
                 this.loadAllData();
+                this.loadAlerts();
+                if (this.eventSource) {
+                    this.connectStream();
+                }
             });
         });
 
         // Time range selector
         document.getElementById('timeRange').addEventListener('change', (e) => {
+            this.historyWindow = null;
             this.loadHistoricalData(e.target.value);
         });
 
+        this.setupHistoryZoom();
+
+        // Work orders are paged and filtered on the server
+        document.getElementById('workOrderStatus').addEventListener('change', () => {
+            this.resetWorkOrderPaging();
+            this.loadWorkOrders();
+        });
+        document.getElementById('workOrdersNext').addEventListener('click', () => {
+            if (!this.workOrderNextCursor) return;
+            this.workOrderCursors.push(this.workOrderCursor);
+            this.workOrderCursor = this.workOrderNextCursor;
+            this.loadWorkOrders();
+        });
+        document.getElementById('workOrdersPrev').addEventListener('click', () => {
+            if (this.workOrderCursors.length === 0) return;
+            this.workOrderCursor = this.workOrderCursors.pop();
+            this.loadWorkOrders();
+        });
+
+        // Stop network and render work while the tab is hidden, and catch up when it is shown again
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                this.stopLiveUpdates();
+                return;
+            }
+            this.loadAlerts();
+            this.loadWorkOrders(true);
+            this.loadHistoricalData(document.getElementById('timeRange').value, true);
+            if (!window.EventSource) {
+                this.loadChanges();
+            }
+            this.setupLiveUpdates();
+        });
+
         // Window resize handler for charts
         window.addEventListener('resize', () => {
             Object.values(this.charts).forEach(chart => {
@@ -106,38 +171,14 @@ class FactoryDashboard {
         try {
             this.showLoadingState();
             
-            // Load all data concurrently
-            const [
-                sensorData,
-                mesData,
-                erpData,
-                workOrders,
-                productionMetrics
-            ] = await Promise.all([
-                this.fetchData(`/api/sensor-data?site=${this.currentSite}`),
-                this.fetchData(`/api/mes-data?site=${this.currentSite}`),
-                this.fetchData(`/api/erp-data?site=${this.currentSite}`),
-                this.fetchData(`/api/work-orders?site=${this.currentSite}`),
-                this.fetchData(`/api/production-metrics?site=${this.currentSite}`)
-            ]);
-
-            // Update UI components
-            this.updateSensorWidgets(sensorData);
-            this.updateProductionLines(mesData);
-            this.updateOEEChart(mesData);
-            this.updateWorkOrders(workOrders);
-            this.updateInventoryStatus(erpData);
-            this.updateFinancialMetrics(erpData);
-            this.updateQualityMetrics(mesData);
-            this.updateDailyProductionMetrics(productionMetrics);
-            this.updateDowntimeMetrics(productionMetrics);
-            this.updateWeeklyPerformanceMetrics(productionMetrics);
-            this.updateEfficiencyChart(productionMetrics);
-
-            
-            // Load historical data for charts
+            // Load every section in one aggregated snapshot request; work orders are paged separately
             const timeRange = document.getElementById('timeRange').value;
-            await this.loadHistoricalData(timeRange);
+            const fields = 'sensor_data,mes_data,erp_data,production_metrics,historical_data';
+            const snapshot = await this.fetchData(
+                `/api/dashboard?site=${this.currentSite}&range=${timeRange}&fields=${fields}`
+            );
+            this.applySnapshot(snapshot);
+            this.loadWorkOrders();
 
             this.updateLastUpdateTime();
             this.hideLoadingState();
@@ -149,8 +190,200 @@ class FactoryDashboard {
         }
     }
 
-    async fetchData(endpoint) {
-        const response = await fetch(endpoint);
+    applySnapshot(snapshot) {
+        // Queue only the sections present in the snapshot; rendering happens in the next frame
+        const {
+            sensor_data: sensorData,
+            mes_data: mesData,
+            erp_data: erpData,
+            production_metrics: productionMetrics,
+            historical_data: historicalData
+        } = snapshot;
+
+        if (sensorData) {
+            this.scheduleRender('sensor_data', () => this.updateSensorWidgets(sensorData));
+        }
+        if (mesData) {
+            this.scheduleRender('mes_data', () => {
+                this.updateProductionLines(mesData);
+                this.updateOEEChart(mesData);
+                this.updateQualityMetrics(mesData);
+            });
+        }
+        if (erpData) {
+            this.scheduleRender('erp_data', () => {
+                this.updateInventoryStatus(erpData);
+                this.updateFinancialMetrics(erpData);
+            });
+        }
+        if (productionMetrics) {
+            this.scheduleRender('production_metrics', () => {
+                this.updateDailyProductionMetrics(productionMetrics);
+                this.updateDowntimeMetrics(productionMetrics);
+                this.updateWeeklyPerformanceMetrics(productionMetrics);
+                this.updateEfficiencyChart(productionMetrics);
+            });
+        }
+        if (historicalData && !this.historyWindow) {
+            this.scheduleRender('historical_data', () => this.updateProductionChart(historicalData));
+        }
+    }
+
+    scheduleRender(section, render) {
+        // Later updates to a section replace earlier ones, so a hidden tab only ever holds one per section
+        this.pendingRenders.set(section, render);
+        if (this.renderFrame === null) {
+            this.renderFrame = requestAnimationFrame(() => this.flushRenders());
+        }
+    }
+
+    flushRenders() {
+        this.renderFrame = null;
+        const renders = Array.from(this.pendingRenders.values());
+        this.pendingRenders.clear();
+        renders.forEach(render => {
+            try {
+                render();
+            } catch (error) {
+                console.error('Error rendering dashboard section:', error);
+            }
+        });
+    }
+
+    setText(element, text) {
+        if (element.textContent !== text) {
+            element.textContent = text;
+        }
+    }
+
+    setClass(element, className) {
+        if (element.className !== className) {
+            element.className = className;
+        }
+    }
+
+    replaceContents(target, values) {
+        // Overwrite an array in place so Chart.js keeps its existing elements
+        values.forEach((value, i) => {
+            target[i] = value;
+        });
+        target.length = values.length;
+    }
+
+    syncChildren(container, items, keyOf, create, update) {
+        // Reuse child nodes by key, create missing ones, drop stale ones and keep item order
+        const existing = new Map();
+        Array.from(container.children).forEach(node => {
+            if (node.dataset.key === undefined) {
+                node.remove();
+            } else {
+                existing.set(node.dataset.key, node);
+            }
+        });
+
+        items.forEach((item, index) => {
+            const key = String(keyOf(item, index));
+            let node = existing.get(key);
+            if (node) {
+                existing.delete(key);
+            } else {
+                node = create(item);
+                node.dataset.key = key;
+            }
+            update(node, item);
+            if (container.children[index] !== node) {
+                container.insertBefore(node, container.children[index] || null);
+            }
+        });
+
+        existing.forEach(node => node.remove());
+    }
+
+    renderMetricRows(containerId, metrics) {
+        this.syncChildren(document.getElementById(containerId), metrics, (metric, index) => index, () => {
+            const metricDiv = document.createElement('div');
+            metricDiv.className = 'metric-row';
+            metricDiv.innerHTML = `
+                <div class="metric-label"></div>
+                <div class="metric-value-small"></div>
+            `;
+            metricDiv.refs = {
+                label: metricDiv.querySelector('.metric-label'),
+                value: metricDiv.querySelector('.metric-value-small')
+            };
+            return metricDiv;
+        }, (metricDiv, metric) => {
+            this.setText(metricDiv.refs.label, metric.label);
+            this.setText(metricDiv.refs.value, metric.value);
+            this.setClass(metricDiv.refs.value, `metric-value-small ${metric.class}`);
+        });
+    }
+
+    handleChanges(changes) {
+        if (changes.full) {
+            this.liveSnapshot = changes.snapshot;
+            this.snapshotVersion = changes.version;
+            this.applySnapshot(changes.snapshot);
+            return;
+        }
+
+        if (changes.base !== this.snapshotVersion || !this.liveSnapshot) {
+            // Missed an update; ask for whatever brings us up to date
+            this.loadChanges();
+            return;
+        }
+
+        this.applyPatch(this.liveSnapshot, changes.patch);
+        this.snapshotVersion = changes.version;
+
+        // Re-render only the sections the patch touched
+        const touched = {};
+        changes.patch.forEach(op => {
+            const section = op.path.split('/')[1];
+            touched[section] = this.liveSnapshot[section];
+        });
+        this.applySnapshot(touched);
+    }
+
+    applyPatch(target, ops) {
+        // Apply JSON-patch add/replace/remove operations in place
+        ops.forEach(op => {
+            const keys = op.path.split('/').slice(1).map(key => key.replace(/~1/g, '/').replace(/~0/g, '~'));
+            const last = keys.pop();
+            const parent = keys.reduce((node, key) => node[key], target);
+            if (op.op === 'remove') {
+                if (Array.isArray(parent)) {
+                    parent.splice(Number(last), 1);
+                } else {
+                    delete parent[last];
+                }
+            } else {
+                parent[last] = op.value;
+            }
+        });
+    }
+
+    async loadChanges() {
+        try {
+            const since = this.snapshotVersion !== null ? `&since=${this.snapshotVersion}` : '';
+            const changes = await this.fetchData(`/api/dashboard/changes?site=${this.currentSite}${since}`, this.liveSnapshot !== null);
+            if (changes) {
+                this.handleChanges(changes);
+            }
+            this.updateLastUpdateTime();
+        } catch (error) {
+            console.error('Error loading dashboard changes:', error);
+        }
+    }
+
+    async fetchData(endpoint, skipIfUnchanged = false) {
+        // Revalidate with the last ETag; a 304 means the data we already hold is current
+        const cached = this.responseCache.get(endpoint);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        const response = await fetch(endpoint, { headers, cache: 'no-store' });
+        if (response.status === 304 && cached) {
+            return skipIfUnchanged ? null : cached.data;
+        }
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
@@ -158,6 +391,15 @@ class FactoryDashboard {
         if (!result.success) {
             throw new Error(result.error || 'Unknown error occurred');
         }
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            // Change feeds use a new URL per version, so keep only the most recent entries
+            this.responseCache.delete(endpoint);
+            this.responseCache.set(endpoint, { etag, data: result.data });
+            if (this.responseCache.size > 32) {
+                this.responseCache.delete(this.responseCache.keys().next().value);
+            }
+        }
         return result.data;
     }
 
@@ -199,69 +441,206 @@ class FactoryDashboard {
         const locationEl = document.getElementById(`${type}Location`);
         const statusEl = document.getElementById(`${type}Status`);
 
-        if (valueEl) valueEl.textContent = `${data.value} ${data.unit}`;
-        if (locationEl) locationEl.textContent = data.location;
+        if (valueEl) this.setText(valueEl, `${data.value} ${data.unit}`);
+        if (locationEl) this.setText(locationEl, data.location);
         if (statusEl) {
-            statusEl.textContent = data.status;
-            statusEl.className = `widget-status status-${data.status}`;
+            this.setText(statusEl, data.status);
+            this.setClass(statusEl, `widget-status status-${data.status}`);
+        }
+    }
+
+    resetWorkOrderPaging() {
+        this.workOrderCursor = null;
+        this.workOrderCursors = [];
+        this.workOrderNextCursor = null;
+    }
+
+    workOrdersUrl() {
+        const params = new URLSearchParams({
+            site: this.currentSite,
+            limit: this.workOrderPageSize,
+            sort: 'due_date'
+        });
+        const status = document.getElementById('workOrderStatus').value;
+        if (status) {
+            params.set('status', status);
+        }
+        if (this.workOrderCursor) {
+            params.set('cursor', this.workOrderCursor);
+        }
+        return `/api/work-orders?${params}`;
+    }
+
+    async loadWorkOrders(skipIfUnchanged = false) {
+        try {
+            const page = await this.fetchData(this.workOrdersUrl(), skipIfUnchanged);
+            if (page === null) return;
+            this.workOrderNextCursor = page.next_cursor;
+            this.scheduleRender('work_orders', () => {
+                this.updateWorkOrders(page.orders);
+                this.updateWorkOrderPager(page);
+            });
+        } catch (error) {
+            console.error('Error loading work orders:', error);
+        }
+    }
+
+    updateWorkOrderPager(page) {
+        const select = document.getElementById('workOrderStatus');
+        const all = Object.values(page.counts).reduce((sum, count) => sum + count, 0);
+        Array.from(select.options).forEach(option => {
+            const count = option.value ? page.counts[option.value] || 0 : all;
+            const label = option.dataset.label || (option.dataset.label = option.textContent);
+            this.setText(option, `${label} (${count})`);
+        });
+
+        const first = this.workOrderCursors.length * this.workOrderPageSize;
+        this.setText(
+            document.getElementById('workOrdersPage'),
+            page.total ? `${first + 1}–${first + page.orders.length} of ${page.total}` : 'No work orders'
+        );
+        document.getElementById('workOrdersPrev').disabled = this.workOrderCursors.length === 0;
+        document.getElementById('workOrdersNext').disabled = !page.next_cursor;
+    }
+
+    async loadAlerts() {
+        try {
+            const alerts = await this.fetchData(`/api/alerts?site=${this.currentSite}`);
+            this.scheduleRender('alerts', () => this.updateAlerts(alerts));
+        } catch (error) {
+            console.error('Error loading alerts:', error);
+        }
+    }
+
+    updateAlerts(alerts) {
+        const container = document.getElementById('activeAlerts');
+        const summaryEl = document.getElementById('alertsSummary');
+        const active = alerts.active;
+        const critical = active.filter(alert => alert.severity === 'critical').length;
+
+        this.setText(summaryEl, `${active.length} active`);
+        this.setClass(summaryEl, `widget-status status-${critical ? 'critical' : active.length ? 'warning' : 'normal'}`);
+
+        if (active.length === 0) {
+            this.syncChildren(container, [null], () => 'empty', () => {
+                const emptyDiv = document.createElement('div');
+                emptyDiv.className = 'text-muted';
+                emptyDiv.textContent = 'No active alerts';
+                return emptyDiv;
+            }, () => {});
+            return;
+        }
+
+        this.syncChildren(container, active, alert => alert.id, () => {
+            const alertDiv = document.createElement('div');
+            alertDiv.className = 'metric-row';
+            alertDiv.innerHTML = `
+                <div>
+                    <div class="metric-label"></div>
+                    <small class="text-muted"></small>
+                </div>
+                <div class="text-end">
+                    <span></span>
+                    <button class="btn btn-sm btn-outline-secondary ms-2">Silence 30m</button>
+                </div>
+            `;
+            alertDiv.refs = {
+                message: alertDiv.querySelector('.metric-label'),
+                detail: alertDiv.querySelector('small'),
+                severity: alertDiv.querySelector('span')
+            };
+            alertDiv.querySelector('button').addEventListener('click', () => this.silenceAlert(alertDiv.dataset.key));
+            return alertDiv;
+        }, (alertDiv, alert) => {
+            const since = new Date(alert.started_at * 1000).toLocaleTimeString('en-US', { hour12: false });
+            this.setText(alertDiv.refs.message, alert.message);
+            this.setText(alertDiv.refs.detail, `Since ${since} \u00b7 ${alert.count} reading${alert.count === 1 ? '' : 's'}`);
+            this.setText(alertDiv.refs.severity, alert.severity);
+            this.setClass(alertDiv.refs.severity, `widget-status status-${alert.severity}`);
+        });
+    }
+
+    async silenceAlert(alertId) {
+        try {
+            await fetch(`/api/alerts/${encodeURIComponent(alertId)}/silence`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ minutes: 30 })
+            });
+            this.loadAlerts();
+        } catch (error) {
+            console.error('Error silencing alert:', error);
         }
     }
 
     updateProductionLines(mesData) {
         const container = document.getElementById('productionLines');
-        container.innerHTML = '';
 
-        mesData.production_lines.forEach(line => {
+        this.syncChildren(container, mesData.production_lines, line => line.id, () => {
             const lineDiv = document.createElement('div');
             lineDiv.className = 'col-md-4';
-            
-            const efficiency = Math.min(100, line.efficiency);
-            const outputPercentage = Math.round((line.output_rate / line.target_rate) * 100);
-
             lineDiv.innerHTML = `
                 <div class="production-line">
                     <div class="d-flex justify-content-between align-items-center mb-2">
-                        <h6 class="mb-0">${line.name}</h6>
-                        <span class="line-status ${line.status}">${line.status}</span>
+                        <h6 class="mb-0"></h6>
+                        <span class="line-status"></span>
                     </div>
                     <div class="mb-2">
-                        <small class="text-muted">Efficiency: ${efficiency}%</small>
+                        <small class="text-muted line-efficiency"></small>
                         <div class="efficiency-bar">
-                            <div class="efficiency-fill" style="width: ${efficiency}%"></div>
+                            <div class="efficiency-fill"></div>
                         </div>
                     </div>
                     <div class="d-flex justify-content-between">
-                        <small>Output: ${line.output_rate}/${line.target_rate}</small>
-                        <small class="${outputPercentage >= 100 ? 'text-success' : outputPercentage >= 80 ? 'text-warning' : 'text-danger'}">
-                            ${outputPercentage}%
-                        </small>
+                        <small class="line-output"></small>
+                        <small class="line-percentage"></small>
                     </div>
                 </div>
             `;
-            
-            container.appendChild(lineDiv);
+            lineDiv.refs = {
+                name: lineDiv.querySelector('h6'),
+                status: lineDiv.querySelector('.line-status'),
+                efficiency: lineDiv.querySelector('.line-efficiency'),
+                fill: lineDiv.querySelector('.efficiency-fill'),
+                output: lineDiv.querySelector('.line-output'),
+                percentage: lineDiv.querySelector('.line-percentage')
+            };
+            return lineDiv;
+        }, (lineDiv, line) => {
+            const { refs } = lineDiv;
+            const efficiency = Math.min(100, line.efficiency);
+            const outputPercentage = Math.round((line.output_rate / line.target_rate) * 100);
+
+            this.setText(refs.name, line.name);
+            this.setText(refs.status, line.status);
+            this.setClass(refs.status, `line-status ${line.status}`);
+            this.setText(refs.efficiency, `Efficiency: ${efficiency}%`);
+            refs.fill.style.width = `${efficiency}%`;
+            this.setText(refs.output, `Output: ${line.output_rate}/${line.target_rate}`);
+            this.setText(refs.percentage, `${outputPercentage}%`);
+            this.setClass(refs.percentage, `line-percentage ${outputPercentage >= 100 ? 'text-success' : outputPercentage >= 80 ? 'text-warning' : 'text-danger'}`);
         });
     }
 
     updateOEEChart(mesData) {
-        const ctx = document.getElementById('oeeChart').getContext('2d');
-        
+        const oeeData = mesData.overall_equipment_effectiveness;
+        const values = [oeeData.availability, oeeData.performance, oeeData.quality];
+
         if (this.charts.oee) {
-            this.charts.oee.destroy();
+            // Update the existing chart in place
+            this.replaceContents(this.charts.oee.data.datasets[0].data, values);
+            this.charts.oee.update('none');
+            this.setText(this.oeeCenterValue, `${oeeData.oee}%`);
+            return;
         }
 
-        const oeeData = mesData.overall_equipment_effectiveness;
-        
+        const ctx = document.getElementById('oeeChart').getContext('2d');
         this.charts.oee = new Chart(ctx, {
             type: 'doughnut',
             data: {
                 labels: ['Availability', 'Performance', 'Quality'],
                 datasets: [{
-                    data: [
-                        oeeData.availability,
-                        oeeData.performance,
-                        oeeData.quality
-                    ],
+                    data: values,
                     backgroundColor: [
                         '#3b82f6',
                         '#10b981',
@@ -294,11 +673,7 @@ class FactoryDashboard {
             }
         });
 
-        // Clear any existing OEE value elements
-        const existingOeeValues = ctx.canvas.parentElement.querySelectorAll('.oee-center-value');
-        existingOeeValues.forEach(element => element.remove());
-        
-        // Add OEE value in center
+        // Add OEE value in center, once; later updates only change its text
         const oeeValue = document.createElement('div');
         oeeValue.className = 'oee-center-value';
         oeeValue.style.position = 'absolute';
@@ -315,72 +690,89 @@ class FactoryDashboard {
         
         ctx.canvas.parentElement.style.position = 'relative';
         ctx.canvas.parentElement.appendChild(oeeValue);
+        this.oeeCenterValue = oeeValue;
     }
 
     updateWorkOrders(workOrders) {
         const container = document.getElementById('workOrdersList');
-        container.innerHTML = '';
 
-        workOrders.forEach(order => {
+        this.syncChildren(container, workOrders, order => order.id, () => {
             const orderDiv = document.createElement('div');
             orderDiv.className = 'work-order-item fade-in';
-            
             orderDiv.innerHTML = `
                 <div class="work-order-header">
-                    <span class="order-id">${order.id}</span>
-                    <span class="order-priority priority-${order.priority}">${order.priority}</span>
+                    <span class="order-id"></span>
+                    <span class="order-priority"></span>
                 </div>
                 <div class="mb-2">
-                    <strong>${order.product}</strong> - Qty: ${order.quantity}
+                    <strong></strong> - Qty: <span class="order-quantity"></span>
                 </div>
                 <div class="mb-2">
-                    <small class="text-muted">Line: ${order.assigned_line} | Due: ${order.due_date}</small>
+                    <small class="text-muted order-details"></small>
                 </div>
                 <div class="progress-bar-container">
-                    <div class="progress-bar-fill" style="width: ${order.progress}%"></div>
+                    <div class="progress-bar-fill"></div>
                 </div>
                 <div class="d-flex justify-content-between mt-1">
                     <small class="text-muted">Progress</small>
-                    <small class="text-primary">${order.progress}%</small>
+                    <small class="text-primary order-progress"></small>
                 </div>
             `;
-            
-            container.appendChild(orderDiv);
+            orderDiv.refs = {
+                id: orderDiv.querySelector('.order-id'),
+                priority: orderDiv.querySelector('.order-priority'),
+                product: orderDiv.querySelector('strong'),
+                quantity: orderDiv.querySelector('.order-quantity'),
+                details: orderDiv.querySelector('.order-details'),
+                fill: orderDiv.querySelector('.progress-bar-fill'),
+                progress: orderDiv.querySelector('.order-progress')
+            };
+            return orderDiv;
+        }, (orderDiv, order) => {
+            const { refs } = orderDiv;
+            this.setText(refs.id, order.id);
+            this.setText(refs.priority, order.priority);
+            this.setClass(refs.priority, `order-priority priority-${order.priority}`);
+            this.setText(refs.product, order.product);
+            this.setText(refs.quantity, String(order.quantity));
+            this.setText(refs.details, `Line: ${order.assigned_line} | Due: ${order.due_date}`);
+            refs.fill.style.width = `${order.progress}%`;
+            this.setText(refs.progress, `${order.progress}%`);
         });
     }
 
     updateInventoryStatus(erpData) {
         const container = document.getElementById('inventoryStatus');
-        container.innerHTML = '';
+        const inventory = Object.entries(erpData.inventory.raw_materials);
 
-        const inventory = erpData.inventory.raw_materials;
-        
-        Object.entries(inventory).forEach(([material, data]) => {
-            const isLow = data.current_stock <= data.minimum_stock;
-            const percentage = (data.current_stock / (data.minimum_stock * 2)) * 100;
-            
+        this.syncChildren(container, inventory, ([material]) => material, ([material]) => {
             const materialDiv = document.createElement('div');
             materialDiv.className = 'metric-row';
             materialDiv.innerHTML = `
                 <div>
-                    <div class="metric-label">${material.replace(/_/g, ' ').toUpperCase()}</div>
-                    <small class="text-muted">${data.current_stock} ${data.unit}</small>
+                    <div class="metric-label"></div>
+                    <small class="text-muted"></small>
                 </div>
                 <div class="text-end">
-                    <span class="metric-value-small ${isLow ? 'metric-negative' : 'metric-positive'}">
-                        ${Math.round(percentage)}%
-                    </span>
+                    <span class="metric-value-small"></span>
                 </div>
             `;
-            
-            container.appendChild(materialDiv);
+            materialDiv.querySelector('.metric-label').textContent = material.replace(/_/g, ' ').toUpperCase();
+            materialDiv.refs = {
+                stock: materialDiv.querySelector('small'),
+                percentage: materialDiv.querySelector('.metric-value-small')
+            };
+            return materialDiv;
+        }, (materialDiv, [material, data]) => {
+            const isLow = data.current_stock <= data.minimum_stock;
+            const percentage = (data.current_stock / (data.minimum_stock * 2)) * 100;
+            this.setText(materialDiv.refs.stock, `${data.current_stock} ${data.unit}`);
+            this.setText(materialDiv.refs.percentage, `${Math.round(percentage)}%`);
+            this.setClass(materialDiv.refs.percentage, `metric-value-small ${isLow ? 'metric-negative' : 'metric-positive'}`);
         });
     }
 
     updateFinancialMetrics(erpData) {
-        const container = document.getElementById('financialMetrics');
-        container.innerHTML = '';
-
         const financial = erpData.financial_metrics;
         const profitMargin = ((financial.daily_revenue - financial.production_cost) / financial.daily_revenue * 100);
         const targetPercentage = (financial.daily_revenue / financial.target_revenue * 100);
@@ -411,21 +803,10 @@ class FactoryDashboard {
             }
         ];
 
-        metrics.forEach(metric => {
-            const metricDiv = document.createElement('div');
-            metricDiv.className = 'metric-row';
-            metricDiv.innerHTML = `
-                <div class="metric-label">${metric.label}</div>
-                <div class="metric-value-small ${metric.class}">${metric.value}</div>
-            `;
-            container.appendChild(metricDiv);
-        });
+        this.renderMetricRows('financialMetrics', metrics);
     }
 
     updateQualityMetrics(mesData) {
-        const container = document.getElementById('qualityMetrics');
-        container.innerHTML = '';
-
         const quality = mesData.quality_metrics;
 
         const metrics = [
@@ -446,39 +827,114 @@ class FactoryDashboard {
             }
         ];
 
-        metrics.forEach(metric => {
-            const metricDiv = document.createElement('div');
-            metricDiv.className = 'metric-row';
-            metricDiv.innerHTML = `
-                <div class="metric-label">${metric.label}</div>
-                <div class="metric-value-small ${metric.class}">${metric.value}</div>
-            `;
-            container.appendChild(metricDiv);
-        });
+        this.renderMetricRows('qualityMetrics', metrics);
     }
 
-    async loadHistoricalData(timeRange) {
+    async loadHistoricalData(timeRange, skipIfUnchanged = false) {
         try {
-            const historicalData = await this.fetchData(`/api/historical-data?range=${timeRange}&site=${this.currentSite}`);
-            this.updateProductionChart(historicalData);
+            const historicalData = await this.fetchData(this.historicalDataUrl(timeRange), skipIfUnchanged);
+            if (historicalData) {
+                this.scheduleRender('historical_data', () => this.updateProductionChart(historicalData));
+            }
         } catch (error) {
             console.error('Error loading historical data:', error);
         }
     }
 
-    updateProductionChart(historicalData) {
-        const ctx = document.getElementById('productionChart').getContext('2d');
-        
-        if (this.charts.production) {
-            this.charts.production.destroy();
+    historicalDataUrl(timeRange) {
+        // Ask for about one point per horizontal pixel; the server downsamples with LTTB
+        const canvas = document.getElementById('productionChart');
+        const maxPoints = Math.max(50, Math.min(2000, canvas.clientWidth || 600));
+        let url = `/api/historical-data?range=${timeRange}&site=${this.currentSite}&max_points=${maxPoints}`;
+        if (this.historyWindow) {
+            url += `&start=${this.historyWindow.start}&end=${this.historyWindow.end}`;
         }
+        return url;
+    }
+
+    setupHistoryZoom() {
+        // Drag across the history chart to fetch finer detail for that window; double-click resets
+        const canvas = document.getElementById('productionChart');
+        let dragStart = null;
 
+        canvas.addEventListener('mousedown', (e) => {
+            dragStart = e.offsetX;
+        });
+        canvas.addEventListener('mouseup', (e) => {
+            const chart = this.charts.production;
+            if (dragStart === null || !chart || Math.abs(e.offsetX - dragStart) < 10) {
+                dragStart = null;
+                return;
+            }
+            const indexAt = (x) => {
+                const index = Math.round(chart.scales.x.getValueForPixel(x));
+                return Math.max(0, Math.min(this.historyPoints.length - 1, index));
+            };
+            const first = this.historyPoints[indexAt(Math.min(dragStart, e.offsetX))];
+            const last = this.historyPoints[indexAt(Math.max(dragStart, e.offsetX))];
+            dragStart = null;
+            if (first && last && first.ts !== undefined && last.ts > first.ts) {
+                this.historyWindow = { start: first.ts, end: last.ts };
+                this.loadHistoricalData(document.getElementById('timeRange').value);
+            }
+        });
+        canvas.addEventListener('dblclick', () => {
+            if (this.historyWindow) {
+                this.historyWindow = null;
+                this.loadHistoricalData(document.getElementById('timeRange').value);
+            }
+        });
+    }
+
+    historyShift(previous, next) {
+        // How many leading points scrolled out when a series moved forward in time, or -1 if it did not
+        if (!previous.length || !next.length || next[0].ts === undefined) return -1;
+        const shift = previous.findIndex(point => point.ts === next[0].ts);
+        if (shift < 0 || previous.length - shift > next.length) return -1;
+        for (let i = shift; i < previous.length; i++) {
+            if (previous[i].ts !== next[i - shift].ts) return -1;
+        }
+        return shift;
+    }
+
+    updateProductionChart(historicalData) {
         const dataPoints = historicalData.data_points;
+        const previous = this.historyPoints;
+        this.historyPoints = dataPoints;
         const labels = dataPoints.map(point => point.timestamp);
         const temperatureData = dataPoints.map(point => point.temperature);
-        const pressureData = dataPoints.map(point => point.pressure);
         const productionData = dataPoints.map(point => point.production_rate);
+        // Dense (downsampled) series read better without point markers
+        const pointRadius = dataPoints.length > 60 ? 0 : 3;
+
+        const chart = this.charts.production;
+        if (chart) {
+            const [production, temperature] = chart.data.datasets;
+            const series = [
+                [chart.data.labels, labels],
+                [production.data, productionData],
+                [temperature.data, temperatureData]
+            ];
+            const shift = this.historyShift(previous, dataPoints);
+            if (shift >= 0) {
+                // Same window moved forward: drop the points that scrolled out, rewrite the newest kept
+                // point (its bucket may still have been filling) and append the new ones
+                const firstChanged = Math.max(0, previous.length - shift - 1);
+                series.forEach(([target, values]) => {
+                    target.splice(0, shift);
+                    for (let i = firstChanged; i < values.length; i++) {
+                        target[i] = values[i];
+                    }
+                });
+            } else {
+                series.forEach(([target, values]) => this.replaceContents(target, values));
+            }
+            chart.options.elements.point.radius = pointRadius;
+            chart.update('none');
+            return;
+        }
 
+        const ctx = document.getElementById('productionChart').getContext('2d');
         this.charts.production = new Chart(ctx, {
             type: 'line',
             data: {
@@ -505,6 +961,11 @@ class FactoryDashboard {
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
+                elements: {
+                    point: {
+                        radius: pointRadius
+                    }
+                },
                 interaction: {
                     mode: 'index',
                     intersect: false,
@@ -564,32 +1025,107 @@ class FactoryDashboard {
         });
     }
 
+    setupLiveUpdates() {
+        this.stopLiveUpdates();
+
+        // History is not part of the live updates; refresh it on a slower cadence
+        this.historyInterval = setInterval(() => {
+            // Background refresh: leave the chart alone when the server answers 304
+            this.loadHistoricalData(document.getElementById('timeRange').value, true);
+        }, 60000);
+
+        // Alerts come from the server-side rules engine; poll them on a short cadence
+        this.alertsInterval = setInterval(() => this.loadAlerts(), 10000);
+
+        // Work orders refresh with their server cache; only the visible page is fetched
+        this.workOrdersInterval = setInterval(() => this.loadWorkOrders(true), 30000);
+
+        if (!window.EventSource) {
+            this.setupAutoRefresh();
+            return;
+        }
+
+        this.streamFailures = 0;
+        this.connectStream();
+    }
+
+    stopLiveUpdates() {
+        // Close the stream and clear every refresh timer
+        [this.refreshInterval, this.historyInterval, this.alertsInterval, this.workOrdersInterval].forEach(interval => {
+            if (interval) {
+                clearInterval(interval);
+            }
+        });
+        this.refreshInterval = null;
+        this.historyInterval = null;
+        this.alertsInterval = null;
+        this.workOrdersInterval = null;
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
+    connectStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+        }
+
+        this.eventSource = new EventSource(`/api/stream?site=${this.currentSite}`);
+
+        const onChanges = (e) => {
+            this.streamFailures = 0;
+            const result = JSON.parse(e.data);
+            if (result.success) {
+                this.handleChanges(result.data);
+                this.updateLastUpdateTime();
+            }
+        };
+        this.eventSource.addEventListener('snapshot', onChanges);
+        this.eventSource.addEventListener('patch', onChanges);
+
+        // EventSource reconnects on its own (sending Last-Event-ID); give up after repeated failures
+        this.eventSource.onerror = () => {
+            this.streamFailures += 1;
+            if (this.streamFailures >= 5) {
+                console.warn('Live stream unavailable, falling back to polling');
+                this.eventSource.close();
+                this.eventSource = null;
+                this.setupAutoRefresh();
+            }
+        };
+    }
+
     setupAutoRefresh() {
-        // Refresh data every 30 seconds
+        // Poll for changes every 30 seconds
+        if (this.refreshInterval) {
+            clearInterval(this.refreshInterval);
+        }
         this.refreshInterval = setInterval(() => {
             if (!this.isLoading) {
-                this.loadAllData();
+                this.loadChanges();
             }
         }, 30000);
     }
 
     destroy() {
-        // Clean up intervals and charts
-        if (this.refreshInterval) {
-            clearInterval(this.refreshInterval);
+        // Clean up intervals, stream, pending renders and charts
+        this.stopLiveUpdates();
+        if (this.renderFrame !== null) {
+            cancelAnimationFrame(this.renderFrame);
+            this.renderFrame = null;
         }
+        this.pendingRenders.clear();
         
         Object.values(this.charts).forEach(chart => {
             if (chart && typeof chart.destroy === 'function') {
                 chart.destroy();
             }
         });
+        this.charts = {};
     }
 
     updateDailyProductionMetrics(productionData) {
-        const container = document.getElementById('dailyProductionMetrics');
-        container.innerHTML = '';
-
         const daily = productionData.daily_production;
         const efficiency = daily.efficiency;
         const targetAchievement = Math.round((daily.actual / daily.target) * 100);
@@ -617,21 +1153,10 @@ class FactoryDashboard {
             }
         ];
 
-        metrics.forEach(metric => {
-            const metricDiv = document.createElement('div');
-            metricDiv.className = 'metric-row';
-            metricDiv.innerHTML = `
-                <div class="metric-label">${metric.label}</div>
-                <div class="metric-value-small ${metric.class}">${metric.value}</div>
-            `;
-            container.appendChild(metricDiv);
-        });
+        this.renderMetricRows('dailyProductionMetrics', metrics);
     }
 
     updateDowntimeMetrics(productionData) {
-        const container = document.getElementById('downtimeMetrics');
-        container.innerHTML = '';
-
         const downtime = productionData.downtime;
         const totalHours = Math.round(downtime.total_minutes / 60 * 10) / 10;
         const plannedHours = Math.round(downtime.planned / 60 * 10) / 10;
@@ -661,21 +1186,10 @@ class FactoryDashboard {
             }
         ];
 
-        metrics.forEach(metric => {
-            const metricDiv = document.createElement('div');
-            metricDiv.className = 'metric-row';
-            metricDiv.innerHTML = `
-                <div class="metric-label">${metric.label}</div>
-                <div class="metric-value-small ${metric.class}">${metric.value}</div>
-            `;
-            container.appendChild(metricDiv);
-        });
+        this.renderMetricRows('downtimeMetrics', metrics);
     }
 
     updateWeeklyPerformanceMetrics(productionData) {
-        const container = document.getElementById('weeklyPerformanceMetrics');
-        container.innerHTML = '';
-
         // Calculate weekly averages from trend data
         const weeklyTrend = productionData.weekly_trend;
         const totalProduction = weeklyTrend.reduce((sum, day) => sum + day.production, 0);
@@ -711,42 +1225,41 @@ class FactoryDashboard {
             }
         ];
 
-        metrics.forEach(metric => {
-            const metricDiv = document.createElement('div');
-            metricDiv.className = 'metric-row';
-            metricDiv.innerHTML = `
-                <div class="metric-label">${metric.label}</div>
-                <div class="metric-value-small ${metric.class}">${metric.value}</div>
-            `;
-            container.appendChild(metricDiv);
-        });
+        this.renderMetricRows('weeklyPerformanceMetrics', metrics);
     }
 
     updateEfficiencyChart(productionData) {
-        const ctx = document.getElementById('efficiencyChart').getContext('2d');
-        
-        if (this.charts.efficiencyChart) {
-            this.charts.efficiencyChart.destroy();
-        }
-
         const weeklyTrend = productionData.weekly_trend;
         const target = productionData.daily_production.target;
-        
+        const labels = weeklyTrend.map(day => day.day);
+        const production = weeklyTrend.map(day => day.production);
+        const targets = weeklyTrend.map(() => target);
+
+        const chart = this.charts.efficiencyChart;
+        if (chart) {
+            this.replaceContents(chart.data.labels, labels);
+            this.replaceContents(chart.data.datasets[0].data, production);
+            this.replaceContents(chart.data.datasets[1].data, targets);
+            chart.update('none');
+            return;
+        }
+
+        const ctx = document.getElementById('efficiencyChart').getContext('2d');
         this.charts.efficiencyChart = new Chart(ctx, {
             type: 'bar',
             data: {
-                labels: weeklyTrend.map(day => day.day),
+                labels: labels,
                 datasets: [
                     {
                         label: 'Production',
-                        data: weeklyTrend.map(day => day.production),
+                        data: production,
                         backgroundColor: '#3b82f6',
                         borderColor: '#1e40af',
                         borderWidth: 2
                     },
                     {
                         label: 'Target',
-                        data: weeklyTrend.map(() => target),
+                        data: targets,
                         type: 'line',
                         borderColor: '#ef4444',
                         backgroundColor: 'transparent',
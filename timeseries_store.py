@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+
+class RollupTier:
+    """A downsampling tier: bucket width in seconds and how long its rows are kept"""
+
+    __slots__ = ('name', 'width', 'retention')
+
+    def __init__(self, name, width, retention):
+        self.name = name
+        self.width = width
+        self.retention = retention
+
+
+class TimeSeriesStore:
+    """Embedded SQLite time-series store with raw samples and precomputed min/max/avg rollups"""
+
+    RAW_RETENTION = 2 * 86400
+    TIERS = (
+        RollupTier('1m', 60, 8 * 86400),
+        RollupTier('1h', 3600, 400 * 86400),
+        RollupTier('1d', 86400, None)
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # SQLite connections must not be carried across fork(); forked workers open their own
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+        self._create_schema()
+        logging.info(f"TimeSeriesStore initialized at {path}")
+
+    def _reset_after_fork(self):
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS samples_raw ('
+                'site TEXT NOT NULL, metric TEXT NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_samples_raw ON samples_raw (site, metric, ts)')
+            for tier in self.TIERS:
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS rollup_{tier.name} ('
+                    'site TEXT NOT NULL, metric TEXT NOT NULL, bucket INTEGER NOT NULL, '
+                    'count INTEGER NOT NULL, total REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL, '
+                    'PRIMARY KEY (site, metric, bucket)) WITHOUT ROWID'
+                )
+
+    def write(self, site, samples, ts=None):
+        """Append one timestamped reading per metric and fold it into every rollup tier"""
+        ts = int(ts if ts is not None else time.time())
+        self.write_many(site, [(metric, ts, value) for metric, value in samples.items()])
+
+    def write_many(self, site, rows):
+        """Append (metric, ts, value) rows in a single transaction"""
+        raw_rows = [(site, metric, int(ts), float(value)) for metric, ts, value in rows]
+        if not raw_rows:
+            return
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                self._insert(connection, raw_rows)
+
+    def seed(self, site, rows):
+        """Write backfill rows for a site unless it already has history; False when it had
+
+        The check and the write share one immediate transaction, so worker
+        processes starting together seed a shared store only once.
+        """
+        raw_rows = [(site, metric, int(ts), float(value)) for metric, ts, value in rows]
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                if self.has_data(site):
+                    return False
+                self._insert(connection, raw_rows)
+        return True
+
+    def _insert(self, connection, raw_rows):
+        connection.executemany('INSERT INTO samples_raw VALUES (?, ?, ?, ?)', raw_rows)
+        for tier in self.TIERS:
+            connection.executemany(
+                f'INSERT INTO rollup_{tier.name} VALUES (?, ?, ?, 1, ?, ?, ?) '
+                'ON CONFLICT (site, metric, bucket) DO UPDATE SET '
+                'count = count + 1, total = total + excluded.total, '
+                'min = MIN(min, excluded.min), max = MAX(max, excluded.max)',
+                [(s, m, ts - ts % tier.width, v, v, v) for s, m, ts, v in raw_rows]
+            )
+
+    def has_data(self, site):
+        """Check whether any history has been recorded for a site"""
+        row = self._connection().execute(
+            f'SELECT 1 FROM rollup_{self.TIERS[-1].name} WHERE site = ? LIMIT 1', (site,)
+        ).fetchone()
+        return row is not None
+
+    def query(self, site, metrics, start, end, tier):
+        """Read min/max/avg rows for a tier (or 'raw' samples) between two epoch timestamps
+
+        Returns a list of (bucket, {metric: (avg, min, max)}) ordered by bucket.
+        """
+        placeholders = ', '.join('?' for _ in metrics)
+        if tier == 'raw':
+            sql = (
+                'SELECT ts, metric, value, value, value FROM samples_raw '
+                f'WHERE site = ? AND metric IN ({placeholders}) AND ts >= ? AND ts <= ? ORDER BY ts'
+            )
+        else:
+            sql = (
+                f'SELECT bucket, metric, total / count, min, max FROM rollup_{tier} '
+                f'WHERE site = ? AND metric IN ({placeholders}) AND bucket >= ? AND bucket <= ? ORDER BY bucket'
+            )
+        rows = self._connection().execute(sql, (site, *metrics, int(start), int(end))).fetchall()
+
+        buckets = {}
+        for bucket, metric, avg, low, high in rows:
+            buckets.setdefault(bucket, {})[metric] = (avg, low, high)
+        return list(buckets.items())
+
+    def iter_rows(self, site, metrics, start, end, tier, batch_size=10000):
+        """Stream (metric, ts, avg, min, max, count) rows for a tier (or 'raw') in batches
+
+        Each batch is its own short query that resumes after the previous batch's
+        last key, so memory use does not depend on how many rows match, and no read
+        transaction stays open between batches to hold back WAL checkpoints while
+        a slow client downloads. Rows come in index order (metric, then time),
+        which SQLite can return without sorting. Rows written during the export
+        appear if they sort after the batch being read.
+        """
+        if tier == 'raw':
+            # Raw samples can share a timestamp, so the rowid breaks ties between batches
+            sql = (
+                'SELECT metric, ts, value, value, value, 1, rowid FROM samples_raw '
+                'WHERE site = ? AND metric = ? AND ts <= ? AND (ts, rowid) > (?, ?) ORDER BY ts, rowid LIMIT ?'
+            )
+        else:
+            sql = (
+                # Buckets are unique per metric; a constant 0 stands in for the rowid so both share one keyset
+                f'SELECT metric, bucket, total / count, min, max, count, 0 FROM rollup_{tier} '
+                'WHERE site = ? AND metric = ? AND bucket <= ? AND (bucket, 0) > (?, ?) ORDER BY bucket LIMIT ?'
+            )
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            # Sorted like ORDER BY metric would, since str order matches SQLite's BINARY collation on UTF-8
+            for metric in sorted(set(metrics)):
+                after = (int(start), -1)
+                while True:
+                    rows = connection.execute(sql, (site, metric, int(end), *after, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    after = (rows[-1][1], rows[-1][6])
+                    yield [row[:6] for row in rows]
+                    if len(rows) < batch_size:
+                        break
+        finally:
+            connection.close()
+
+    def finest_tier(self, start, end, max_rows, now=None, raw_interval=10):
+        """Pick the finest tier still retained at `start` that spans the window in at most max_rows buckets
+
+        Raw samples are assumed to arrive every raw_interval seconds. Falls back to
+        the coarsest tier when none fits.
+        """
+        now = now if now is not None else time.time()
+        candidates = [('raw', raw_interval, self.RAW_RETENTION)]
+        candidates.extend((tier.name, tier.width, tier.retention) for tier in self.TIERS)
+        for name, width, retention in candidates:
+            if retention is not None and start < now - retention:
+                continue
+            if (end - start) / width <= max_rows:
+                return name
+        return self.TIERS[-1].name
+
+    def tier_width(self, tier, raw_interval=10):
+        """Bucket width in seconds of a tier, counting 'raw' as one sample interval"""
+        if tier == 'raw':
+            return raw_interval
+        return next(t.width for t in self.TIERS if t.name == tier)
+
+    def prune(self, now=None):
+        """Drop raw samples and rollup rows older than their retention"""
+        now = int(now if now is not None else time.time())
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.execute('DELETE FROM samples_raw WHERE ts < ?', (now - self.RAW_RETENTION,))
+                for tier in self.TIERS:
+                    if tier.retention is not None:
+                        connection.execute(
+                            f'DELETE FROM rollup_{tier.name} WHERE bucket < ?', (now - tier.retention,)
+                        )
+
+
+class HistoryRecorder:
+    """Background thread sampling live readings into the time-series store
+
+    `is_leader`, when given, gates each round so that only one of several worker
+    processes sharing the store writes to it.
+    """
+
+    def __init__(self, store, sample, sites, interval=10.0, prune_every=3600.0, is_leader=None):
+        self.store = store
+        self.sample = sample
+        self.sites = sites
+        self.interval = interval
+        self.prune_every = prune_every
+        self.is_leader = is_leader
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='history-recorder', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        last_prune = None
+        while True:
+            if self.is_leader is not None and not self.is_leader():
+                time.sleep(self.interval)
+                continue
+            for site in self.sites:
+                try:
+                    self.store.write(site, self.sample(site))
+                except Exception as e:
+                    logging.error(f"Error recording history for {site}: {str(e)}")
+            if last_prune is None or time.monotonic() - last_prune >= self.prune_every:
+                try:
+                    self.store.prune()
+                except Exception as e:
+                    logging.error(f"Error pruning history: {str(e)}")
+                last_prune = time.monotonic()
+            time.sleep(self.interval)
@@ -0,0 +1,288 @@
+import base64
+import heapq
+import json
+import threading
+from collections import Counter
+from bisect import bisect_left, bisect_right, insort
+
+from responses import dumps
+
+# Ascending priority order puts the most urgent first
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+SORT_KEYS = ('due_date', 'start_date', 'priority', 'progress', 'quantity', 'id')
+# Types a present sort value may have; dates are ISO strings and priority is its rank
+SORT_TYPES = {
+    'due_date': (str,), 'start_date': (str,), 'priority': (int,),
+    'progress': (int, float), 'quantity': (int, float), 'id': (str,)
+}
+STATUSES = ('in_progress', 'pending', 'on_hold', 'completed')
+MAX_PAGE_SIZE = 500
+
+
+def sort_value(order, key):
+    # Missing fields sort last without ever comparing None against a value
+    value = PRIORITY_RANK.get(order.get('priority'), len(PRIORITY_RANK)) if key == 'priority' else order.get(key)
+    return (1, 0) if value is None else (0, value)
+
+
+def encode_cursor(sort, descending, entry):
+    """Opaque keyset cursor: resume strictly after `entry` in the same sort"""
+    raw = dumps([sort, descending, list(entry[0]), entry[1]])
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def valid_sort_value(value, sort):
+    """Check a decoded cursor value has the shape sort_value() gives, so bisecting cannot compare mismatched types"""
+    if not isinstance(value, list) or len(value) != 2:
+        return False
+    missing, present = value
+    if type(missing) is not int or missing not in (0, 1):
+        return False
+    if missing:
+        return type(present) is int and present == 0
+    return isinstance(present, SORT_TYPES[sort]) and not isinstance(present, bool)
+
+
+def decode_cursor(cursor, sort, descending):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, cursor_descending, value, order_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError('Cursor was issued for a different sort order')
+    if not valid_sort_value(value, sort) or not isinstance(order_id, str):
+        raise ValueError('Invalid cursor')
+    return (tuple(value), order_id)
+
+
+def entries_after(index, after, descending):
+    """Iterate a sorted (value, id) list from just past a cursor entry, in either direction"""
+    if descending:
+        end = bisect_left(index, after) if after is not None else len(index)
+        return (index[i] for i in range(end - 1, -1, -1))
+    start = bisect_right(index, after) if after is not None else 0
+    return (index[i] for i in range(start, len(index)))
+
+
+class WorkOrderStore:
+    """In-memory work orders for one site with secondary indexes and keyset pagination
+
+    Orders are indexed by status, priority and assigned line (id sets) and kept in
+    one sorted (value, id) list per sort key, so a page is found by bisecting to
+    the cursor rather than sorting the whole set on every request. Each status,
+    and priority pair, overall and on each line, also keeps its own sorted lists,
+    so a filtered page merges lists in which every order matches rather than
+    walking past the orders that do not.
+    """
+
+    # Rebuild the sorted lists outright once more than this fraction of orders changed
+    REBUILD_FRACTION = 0.25
+
+    def __init__(self):
+        self._orders = {}
+        self._by_status = {}
+        self._by_priority = {}
+        self._by_line = {}
+        # Orders per (status, priority, assigned line), for totals and status counts without set work
+        self._tally = Counter()
+        self._sorted = {key: [] for key in SORT_KEYS}
+        # (status, priority) -> sort key -> sorted list, overall and per assigned line
+        self._sorted_by_pair = {}
+        self._sorted_by_line = {}
+        self._source = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def sync(self, orders):
+        """Bring the store in line with a full list of orders, touching only those that changed"""
+        with self._lock:
+            # Sections are cached, so an unchanged list is usually the very same object
+            if orders is self._source:
+                return
+            self._source = orders
+            incoming = {order['id']: order for order in orders}
+            changed = [order for order_id, order in incoming.items() if self._orders.get(order_id) != order]
+            removed = [order_id for order_id in self._orders if order_id not in incoming]
+            rebuild = len(changed) + len(removed) > self.REBUILD_FRACTION * max(len(self._orders), 1)
+
+            for order_id in removed:
+                self._unindex(self._orders.pop(order_id), rebuild)
+            for order in changed:
+                previous = self._orders.get(order['id'])
+                if previous is not None:
+                    self._unindex(previous, rebuild)
+                self._orders[order['id']] = order
+                self._index(order, rebuild)
+            if rebuild:
+                self._sorted_by_pair = {}
+                self._sorted_by_line = {}
+                pair_lists = {order_id: self._pair_lists(order) for order_id, order in self._orders.items()}
+                for key in SORT_KEYS:
+                    index = self._sorted[key] = sorted(
+                        (sort_value(order, key), order_id) for order_id, order in self._orders.items()
+                    )
+                    # Appending in sorted order keeps every pair's lists sorted too
+                    for entry in index:
+                        for lists in pair_lists[entry[1]]:
+                            lists[key].append(entry)
+
+    def _pair_lists(self, order):
+        """Get the per-sort-key lists of an order's (status, priority) pair, overall and on its line"""
+        pair = (order.get('status'), order.get('priority'))
+        found = []
+        for by_pair in (self._sorted_by_pair, self._sorted_by_line.setdefault(order.get('assigned_line'), {})):
+            lists = by_pair.get(pair)
+            if lists is None:
+                lists = by_pair[pair] = {key: [] for key in SORT_KEYS}
+            found.append(lists)
+        return found
+
+    def _index(self, order, skip_sorted=False):
+        order_id = order['id']
+        self._by_status.setdefault(order.get('status'), set()).add(order_id)
+        self._by_priority.setdefault(order.get('priority'), set()).add(order_id)
+        self._by_line.setdefault(order.get('assigned_line'), set()).add(order_id)
+        self._tally[order.get('status'), order.get('priority'), order.get('assigned_line')] += 1
+        if not skip_sorted:
+            pair_lists = self._pair_lists(order)
+            for key in SORT_KEYS:
+                entry = (sort_value(order, key), order_id)
+                insort(self._sorted[key], entry)
+                for lists in pair_lists:
+                    insort(lists[key], entry)
+
+    def _unindex(self, order, skip_sorted=False):
+        order_id = order['id']
+        self._by_status[order.get('status')].discard(order_id)
+        self._by_priority[order.get('priority')].discard(order_id)
+        self._by_line[order.get('assigned_line')].discard(order_id)
+        key = (order.get('status'), order.get('priority'), order.get('assigned_line'))
+        self._tally[key] -= 1
+        if not self._tally[key]:
+            del self._tally[key]
+        if not skip_sorted:
+            pair_lists = self._pair_lists(order)
+            for key in SORT_KEYS:
+                entry = (sort_value(order, key), order_id)
+                for index in [self._sorted[key]] + [lists[key] for lists in pair_lists]:
+                    del index[bisect_left(index, entry)]
+
+    def _due_between(self, due_after, due_before):
+        index = self._sorted['due_date']
+        lo = bisect_left(index, ((0, due_after),)) if due_after is not None else 0
+        # Dates are ISO strings, so every date on due_before sorts below due_before + a high character
+        hi = bisect_right(index, ((0, due_before + '\uffff'),)) if due_before is not None else len(index)
+        return {order_id for _, order_id in index[lo:hi]}
+
+    @staticmethod
+    def _union(index, values):
+        # A single value reuses the index set itself; callers never mutate the result
+        if len(values) == 1:
+            return index.get(values[0], set())
+        return set().union(*(index.get(value, ()) for value in values))
+
+    def _filter(self, statuses, priorities, line, due_after, due_before):
+        """Intersect the secondary indexes for the given filters (at least one), smallest first"""
+        sets = []
+        if statuses:
+            sets.append(self._union(self._by_status, statuses))
+        if priorities:
+            sets.append(self._union(self._by_priority, priorities))
+        if line is not None:
+            sets.append(self._by_line.get(line, set()))
+        if due_after is not None or due_before is not None:
+            sets.append(self._due_between(due_after, due_before))
+        sets.sort(key=len)
+        # set & set iterates the smaller operand, so a selective filter keeps this cheap
+        return sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+
+    def _walk_lists(self, sort, statuses, priorities, line):
+        """Get the sorted lists holding exactly the orders that match the status, priority and line filters"""
+        if line is not None:
+            by_pair = self._sorted_by_line.get(line, {})
+        elif statuses or priorities:
+            by_pair = self._sorted_by_pair
+        else:
+            return [self._sorted[sort]]
+        return [
+            lists[sort] for (status, priority), lists in by_pair.items()
+            if (not statuses or status in statuses) and (not priorities or priority in priorities)
+        ]
+
+    def _tally_counts(self, statuses, priorities, line):
+        """Match total and per-status counts from the (status, priority, line) tally"""
+        counts = dict.fromkeys(STATUSES, 0)
+        total = 0
+        for (status, priority, assigned_line), count in self._tally.items():
+            if (priorities and priority not in priorities) or (line is not None and assigned_line != line):
+                continue
+            counts[status] = counts.get(status, 0) + count
+            if not statuses or status in statuses:
+                total += count
+        return total, counts
+
+    def query(self, statuses=(), priorities=(), line=None, due_after=None, due_before=None,
+              sort='due_date', descending=False, limit=50, cursor=None):
+        """Get one page of matching orders plus the match total and per-status counts
+
+        Status counts respect every filter except status itself, so they can label
+        status filter buttons. Due-date ranges are matched through id sets, so
+        unlike the other filters their cost grows with the orders in range.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after = decode_cursor(cursor, sort, descending) if cursor else None
+
+        with self._lock:
+            matched = None
+            if due_after is None and due_before is None:
+                total, counts = self._tally_counts(statuses, priorities, line)
+            else:
+                # Date ranges are not tallied; count over the ids in range instead
+                in_range = self._filter((), priorities, line, due_after, due_before)
+                counts = dict.fromkeys(STATUSES, 0)
+                for order_id in in_range:
+                    status = self._orders[order_id].get('status')
+                    counts[status] = counts.get(status, 0) + 1
+                matched = self._filter(statuses, (), None, None, None) & in_range if statuses else in_range
+                total = len(matched)
+
+            lists = self._walk_lists(sort, statuses, priorities, line)
+            # Every walked entry matches unless a date range applies. Then walking visits about
+            # limit * w / m entries for m matches among the w walked, and sorting the matches
+            # themselves is cheaper when they are very few
+            if matched is not None and total ** 2 < (limit + 1) * sum(map(len, lists)):
+                entries = sorted((sort_value(self._orders[i], sort), i) for i in matched)
+                if descending:
+                    end = bisect_left(entries, after) if after is not None else len(entries)
+                    page = entries[max(0, end - limit - 1):end][::-1]
+                else:
+                    start = bisect_right(entries, after) if after is not None else 0
+                    page = entries[start:start + limit + 1]
+            else:
+                walks = [entries_after(walk, after, descending) for walk in lists]
+                candidates = walks[0] if len(walks) == 1 else heapq.merge(*walks, reverse=descending)
+                page = []
+                for entry in candidates:
+                    if matched is not None and entry[1] not in matched:
+                        continue
+                    page.append(entry)
+                    if len(page) > limit:
+                        break
+
+            has_more = len(page) > limit
+            page = page[:limit]
+            return {
+                'orders': [self._orders[order_id] for _, order_id in page],
+                'next_cursor': encode_cursor(sort, descending, page[-1]) if has_more else None,
+                'total': total,
+                'counts': counts,
+                'sort': sort,
+                'order': 'desc' if descending else 'asc',
+                'limit': limit
+            }